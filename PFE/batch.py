@@ -0,0 +1,252 @@
+"""Batch lineup generation over a grid of settings.
+
+Every combination of tactic, formation, age band, nation, club and selection
+mode becomes one job. Jobs run across a process pool; each worker process
+loads the prepared dataset once (from the on-disk cache, which the parent
+warms first) and then answers its share of jobs through ``TeamEngine``.
+Results, including per-job timings and failures, are written as JSON or CSV.
+
+Examples:
+
+    python batch.py -o report.json
+    python batch.py --tactics possession,balanced --ages 18-23,24-29,any \\
+        --clubs '*' --mode Optimal -o report.csv
+
+List options are comma separated. For ``--nations`` and ``--clubs``, ``Any``
+means no filter and ``*`` expands to every value in the dataset.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import DEFAULT_DATA_PATH, FORMATIONS, SELECTION_MODES, TeamEngine, make_params
+
+ANY = "Any"
+EXPAND_ALL = "*"
+
+# Columns of the CSV output; one row per selected player, or one per failed job
+CSV_FIELDS = [
+    'job', 'tactic', 'formation', 'selection_mode', 'min_age', 'max_age', 'nation', 'team',
+    'status', 'error', 'elapsed_ms', 'total_score', 'slot', 'player', 'pos', 'pos_group', 'club',
+    'performance_score',
+]
+
+# Per-process engine, set by init_worker
+_engine = None
+
+
+def split_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_age_band(band):
+    """'18-23' -> (18, 23); 'any' -> (None, None)"""
+    if band.lower() == 'any':
+        return None, None
+    try:
+        low, high = (int(part) for part in band.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid age band '{band}', expected e.g. 18-23 or any") from None
+    return low, high
+
+
+def expand_values(values, column, df):
+    """Resolve ``Any`` to None and ``*`` to every value of ``column``."""
+    expanded = []
+    for value in values:
+        if value == EXPAND_ALL:
+            expanded.extend(sorted(df[column].unique().tolist()))
+        else:
+            expanded.append(None if value == ANY else value)
+    return list(dict.fromkeys(expanded))
+
+
+def build_jobs(tactics, formations, age_bands, nations, clubs, modes, common, known_tactics=None):
+    """Return one parameter dict per grid point, validated by make_params."""
+    jobs = []
+    for tactic, formation, (min_age, max_age), nation, club, mode in itertools.product(
+            tactics, formations, age_bands, nations, clubs, modes):
+        params = make_params(dict(
+            common,
+            tactic=tactic,
+            formation=formation,
+            min_age=min_age,
+            max_age=max_age,
+            nation=nation,
+            team=club,
+            selection_mode=mode,
+        ), tactics=known_tactics)
+        jobs.append(params)
+    return jobs
+
+
+def init_worker(data_path):
+    global _engine
+    _engine = TeamEngine(data_path)
+
+
+def run_job(job):
+    """Generate one lineup; never raises, failures are part of the result."""
+    number, params, seed = job
+    start = time.perf_counter()
+    result = {'job': number, 'params': params}
+    try:
+        team = _engine.generate_team(params, rng=np.random.default_rng(seed))
+    except ValueError as e:
+        # User-facing messages, such as too few players after the filters
+        result.update(status='error', error=str(e))
+    except Exception as e:
+        # Anything else fails this job only, not the whole grid
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+    else:
+        result.update(
+            status='ok',
+            total_score=round(float(team['performance_score'].sum()), 4),
+            players=[
+                {
+                    'player': row.Player,
+                    'pos': row.Pos,
+                    'pos_group': row.pos_group,
+                    'club': row.Team,
+                    'performance_score': round(float(row.performance_score), 4),
+                }
+                for row in team.itertuples(index=False)
+            ],
+        )
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def run_batch(data_path, jobs, workers=None, seed=0, chunksize=None):
+    """Run every job and return the results in job order."""
+    numbered = [(number, params, seed + number) for number, params in enumerate(jobs)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        init_worker(data_path)
+        return [run_job(job) for job in numbered]
+
+    # Large chunks keep the per-job IPC overhead well below the job cost
+    chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(data_path,)) as pool:
+        return list(pool.map(run_job, numbered, chunksize=chunksize))
+
+
+def summarize(results, wall_seconds, workers):
+    elapsed = np.array([result['elapsed_ms'] for result in results]) if results else np.zeros(1)
+    failed = sum(result['status'] != 'ok' for result in results)
+    return {
+        'jobs': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'workers': workers,
+        'wall_s': round(wall_seconds, 3),
+        'job_ms_mean': round(float(elapsed.mean()), 3),
+        'job_ms_p95': round(float(np.percentile(elapsed, 95)), 3),
+        'job_ms_max': round(float(elapsed.max()), 3),
+    }
+
+
+def write_json(path, summary, results):
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'summary': summary, 'results': results}, fh, indent=2)
+
+
+def write_csv(path, results):
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for result in results:
+            params = result['params']
+            base = {
+                'job': result['job'],
+                'tactic': params['tactic'],
+                'formation': params['formation'],
+                'selection_mode': params['selection_mode'],
+                'min_age': params['min_age'],
+                'max_age': params['max_age'],
+                'nation': params['nation'] or ANY,
+                'team': params['team'] or ANY,
+                'status': result['status'],
+                'error': result.get('error', ''),
+                'elapsed_ms': result['elapsed_ms'],
+                'total_score': result.get('total_score', ''),
+            }
+            if result['status'] != 'ok':
+                writer.writerow(base)
+                continue
+            for slot, player in enumerate(result['players']):
+                writer.writerow(dict(base, slot=slot, **player))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate lineups for every combination of settings")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH), help="path to data.csv")
+    parser.add_argument("--tactics", default="*", help="tactics to sweep; * for all, including tactics.json")
+    parser.add_argument("--formations", default=",".join(FORMATIONS), help="formations to sweep")
+    parser.add_argument("--ages", default="any", help="age bands such as 18-23,24-29 or any")
+    parser.add_argument("--nations", default=ANY, help="nations to sweep; Any for no filter, * for all")
+    parser.add_argument("--clubs", default=ANY, help="clubs to sweep; Any for no filter, * for all")
+    parser.add_argument("--mode", default=SELECTION_MODES[0],
+                        help=f"selection modes to sweep ({', '.join(SELECTION_MODES)})")
+    parser.add_argument("--min-minutes", type=float, default=None)
+    parser.add_argument("--max-per-club", type=int, default=None)
+    parser.add_argument("--exclude-injured", action="store_true")
+    parser.add_argument("--exclude-suspended", action="store_true")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; job i samples with seed + i")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", required=True, help="output file, .json or .csv")
+    args = parser.parse_args(argv)
+
+    if not args.output.lower().endswith(('.json', '.csv')):
+        parser.error("--output must end in .json or .csv")
+
+    # Loading here also writes the dataset cache the workers will read
+    engine = TeamEngine(args.data)
+    common = {
+        'min_minutes': args.min_minutes,
+        'max_per_club': args.max_per_club,
+        'exclude_injured': args.exclude_injured,
+        'exclude_suspended': args.exclude_suspended,
+    }
+    try:
+        age_bands = [parse_age_band(band) for band in split_list(args.ages)]
+        tactics = split_list(args.tactics)
+        jobs = build_jobs(
+            list(engine.tactics) if tactics == ['*'] else tactics,
+            split_list(args.formations),
+            age_bands,
+            expand_values(split_list(args.nations), 'Nation', engine.df),
+            expand_values(split_list(args.clubs), 'Team', engine.df),
+            split_list(args.mode),
+            common,
+            known_tactics=engine.tactics,
+        )
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Running {len(jobs)} jobs on {workers} worker(s)...", file=sys.stderr)
+    start = time.perf_counter()
+    results = run_batch(args.data, jobs, workers=workers, seed=args.seed)
+    summary = summarize(results, time.perf_counter() - start, workers)
+
+    if args.output.lower().endswith('.json'):
+        write_json(args.output, summary, results)
+    else:
+        write_csv(args.output, results)
+    print(
+        f"{summary['succeeded']} lineups, {summary['failed']} failed, "
+        f"in {summary['wall_s']:.2f} s (mean {summary['job_ms_mean']:.1f} ms per job)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Performance bar chart, shared by the GUI and the export pipeline."""
+from pitch import BACKGROUND_COLOR, PLAYER_COLOR
+
+
+def draw_performance(ax, team, font_family='sans-serif'):
+    """Draw ``team``'s performance scores as horizontal bars on a cleared ``ax``."""
+    ax.clear()
+
+    # Sort players by performance score
+    sorted_team = team.sort_values('performance_score', ascending=True)
+
+    # Create horizontal bar chart
+    bars = ax.barh(
+        sorted_team['Player'],
+        sorted_team['performance_score'],
+        color=PLAYER_COLOR
+    )
+
+    # Add value labels
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(
+            width + 0.1,
+            bar.get_y() + bar.get_height()/2,
+            f'{width:.2f}',
+            va='center',
+            fontfamily=font_family
+        )
+
+    # Customize plot
+    ax.set_title(
+        'Player Performance Scores',
+        color='white',
+        pad=20,
+        fontfamily=font_family,
+        fontsize=12
+    )
+    ax.set_facecolor(BACKGROUND_COLOR)
+    ax.tick_params(colors='white', labelsize=10)
+    ax.grid(True, linestyle='--', alpha=0.3)
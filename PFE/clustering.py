@@ -0,0 +1,181 @@
+"""Persisted player clusters, updated incrementally.
+
+The model keeps the fitted scaler, every player's scaled stat vector and
+cluster, and the per-cluster sum and count, so each centroid is always the
+exact mean of its current members. On load, only players that are new or
+whose stats changed are (re)assigned to the nearest centroid, and only their
+clusters' sums move: no refit and no sklearn import. A full KMeans refit
+happens when there is no model yet, when the stat columns or cluster count
+change, or on demand (``python clustering.py --refit``).
+
+Each source file has its own model next to the prepared-dataset cache, as
+``<stem>.clusters.npz`` (see ``model_file``), so loading several files from
+one folder (such as one CSV per season) never mixes their players; a model
+outlives cache entries, which are keyed by the CSV contents.
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+
+MODEL_SUFFIX = ".clusters.npz"
+RANDOM_STATE = 42
+
+
+def model_file(data_path):
+    """File name of the cluster model for the CSV at ``data_path``."""
+    return f"{Path(data_path).stem}{MODEL_SUFFIX}"
+
+
+def row_keys(df):
+    """Stable identity for each row: player, club and a duplicate counter."""
+    occurrence = df.groupby(['Player', 'Team'], sort=False).cumcount()
+    return np.array([
+        f"{player}|{team}|{n}"
+        for player, team, n in zip(df['Player'].astype(str), df['Team'].astype(str), occurrence)
+    ])
+
+
+class ClusterModel:
+    def __init__(self, stats, mean, scale, sums, counts, keys, vectors, labels):
+        self.stats = list(stats)
+        self.mean = mean
+        self.scale = scale
+        self.sums = sums
+        self.counts = counts
+        self.keys = keys
+        self.vectors = vectors
+        self.labels = labels
+
+    @property
+    def n_clusters(self):
+        return len(self.counts)
+
+    @property
+    def centroids(self):
+        return self.sums / np.maximum(self.counts, 1)[:, None]
+
+    @classmethod
+    def fit(cls, values, keys, stats, n_clusters):
+        """Full fit: StandardScaler followed by KMeans, as the app always did."""
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        vectors = scaler.fit_transform(values)
+        labels = KMeans(n_clusters=n_clusters, random_state=RANDOM_STATE).fit_predict(vectors)
+        sums = np.zeros((n_clusters, vectors.shape[1]))
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+        return cls(stats, scaler.mean_, scaler.scale_, sums, counts, keys, vectors, labels)
+
+    def transform(self, values):
+        return (np.asarray(values, dtype=np.float64) - self.mean) / self.scale
+
+    def predict(self, vectors):
+        distances = ((vectors[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        # A cluster whose members all left has no centroid
+        distances[:, self.counts == 0] = np.inf
+        return distances.argmin(axis=1)
+
+    def update(self, values, keys):
+        """Bring the model in line with the current rows.
+
+        Unchanged rows keep their cluster. Removed and changed rows leave
+        their old cluster, then changed and new rows join their nearest
+        centroid one at a time, moving it as they join (mini-batch style).
+        Returns (labels, scaled vectors, rows added, changed or removed).
+        """
+        vectors = self.transform(values)
+        position_of = {key: i for i, key in enumerate(self.keys)}
+        old = np.array([position_of.get(key, -1) for key in keys], dtype=np.int64)
+        known = old >= 0
+        unchanged = known.copy()
+        unchanged[known] = np.isclose(self.vectors[old[known]], vectors[known]).all(axis=1)
+
+        # Drop the contribution of rows that changed or disappeared
+        kept = np.zeros(len(self.keys), dtype=bool)
+        kept[old[unchanged]] = True
+        np.subtract.at(self.sums, self.labels[~kept], self.vectors[~kept])
+        np.subtract.at(self.counts, self.labels[~kept], 1)
+
+        labels = np.empty(len(keys), dtype=np.int64)
+        labels[unchanged] = self.labels[old[unchanged]]
+        for row in np.flatnonzero(~unchanged):
+            label = int(self.predict(vectors[row:row + 1])[0])
+            labels[row] = label
+            self.sums[label] += vectors[row]
+            self.counts[label] += 1
+
+        changed = int((~unchanged).sum()) + int((~kept).sum()) - int((known & ~unchanged).sum())
+        self.keys, self.vectors, self.labels = keys, vectors, labels
+        return labels, vectors, changed
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.tmp{os.getpid()}.npz")
+        np.savez(
+            tmp,
+            stats=np.array(self.stats),
+            mean=self.mean,
+            scale=self.scale,
+            sums=self.sums,
+            counts=self.counts,
+            keys=self.keys,
+            vectors=self.vectors,
+            labels=self.labels,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Return the saved model, or None if it is missing or unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data['stats'].tolist(), data['mean'], data['scale'], data['sums'],
+                    data['counts'], data['keys'], data['vectors'], data['labels'],
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def assign_clusters(df, stats, n_clusters, model_path, refit=False):
+    """Return (labels, scaled stats) for ``df``, updating the model at ``model_path``."""
+    values = df[stats].to_numpy(dtype=np.float64)
+    keys = row_keys(df)
+    model = None if refit else ClusterModel.load(model_path)
+    if model is None or model.stats != list(stats) or model.n_clusters != n_clusters:
+        model = ClusterModel.fit(values, keys, stats, n_clusters)
+        changed = len(keys)
+        labels, vectors = model.labels, model.vectors
+    else:
+        labels, vectors, changed = model.update(values, keys)
+
+    if changed:
+        try:
+            model.save(model_path)
+        except OSError as e:
+            print(f"Could not save cluster model: {e}")
+    return labels, vectors
+
+
+if __name__ == "__main__":
+    from data_cache import DatasetCache, N_CLUSTERS, STATS_COLS, clean_dataset
+    from engine import DEFAULT_DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Refit the persisted player clusters")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH), help="path to data.csv")
+    parser.add_argument("--refit", action="store_true", help="full KMeans refit (default: incremental update)")
+    args = parser.parse_args()
+
+    cache = DatasetCache(args.data)
+    df = clean_dataset(args.data)
+    model_path = cache.cache_dir / model_file(args.data)
+    labels, _ = assign_clusters(df, STATS_COLS, N_CLUSTERS, model_path, refit=args.refit)
+    # Prepared entries carry the old labels
+    cache.invalidate()
+    sizes = np.bincount(labels, minlength=N_CLUSTERS)
+    print(f"{len(df)} players in {N_CLUSTERS} clusters, sizes {sizes.tolist()}")
@@ -0,0 +1,194 @@
+"""On-disk cache of the prepared player dataset.
+
+Parsing ``data.csv``, cleaning it and clustering it is most of the
+cold-start cost, so the prepared frame, scaled matrix and cluster labels are
+written next to the CSV and reused until the source file (or the
+preparation code) changes. The cluster model itself is persisted separately
+(see ``clustering``) and is only updated for rows that changed.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever prepare_dataset() changes what it produces
+CACHE_VERSION = 4
+
+CACHE_DIR_NAME = ".team_cache"
+STATS_COLS = ['Gls', 'Ast', 'xG', 'PrgP']
+N_CLUSTERS = 4
+
+PreparedData = namedtuple("PreparedData", ["df", "X_scaled", "version"])
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(content_digest):
+    """Combine the source digest with everything that affects the output."""
+    parts = [content_digest, str(CACHE_VERSION), pd.__version__, np.__version__]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def clean_dataset(file_path):
+    """Parse and clean the CSV and add the position group."""
+    from roles import primary_role
+
+    df = pd.read_csv(file_path)
+    df.fillna(0, inplace=True)
+
+    # Primary role; multi-role values such as "FW,MF" take the first one
+    df['pos_group'] = df['Pos'].map(primary_role)
+    return df
+
+
+def prepare_dataset(file_path, model_path=None):
+    """Clean the CSV, scale and cluster the core stats, and compact the frame.
+
+    Clusters come from the persisted model at ``model_path`` (by default the
+    CSV's own model in the cache directory next to it), which is only
+    refitted when missing; see ``clustering``.
+    """
+    from clustering import assign_clusters, model_file
+    from player_table import compact_frame
+
+    df = clean_dataset(file_path)
+    if model_path is None:
+        model_path = Path(file_path).parent / CACHE_DIR_NAME / model_file(file_path)
+    df['cluster'], X_scaled = assign_clusters(df, STATS_COLS, N_CLUSTERS, model_path)
+    return compact_frame(df), X_scaled
+
+
+class DatasetCache:
+    """Stores prepared datasets under ``<csv dir>/.team_cache/<key>/``."""
+
+    def __init__(self, file_path, cache_dir=None):
+        self.file_path = Path(file_path)
+        if cache_dir is None:
+            cache_dir = self.file_path.parent / CACHE_DIR_NAME
+        self.cache_dir = Path(cache_dir)
+        self.manifest_path = self.cache_dir / "manifest.json"
+
+    def _read_manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        # Atomic, so concurrent writers or a crash never leave a torn file
+        tmp = self.manifest_path.with_name(
+            f"{self.manifest_path.name}.tmp{os.getpid()}-{threading.get_ident()}"
+        )
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.manifest_path)
+
+    def _record(self, manifest, key, digest, stat):
+        manifest[str(self.file_path.resolve())] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": digest,
+            "key": key,
+        }
+
+    def current_key(self):
+        """Return (key, digest, stat, recorded) for the source file as it is on disk now.
+
+        The content hash is only recomputed when size or mtime differ from
+        what the manifest recorded (``recorded`` is then False), so an
+        unchanged file costs one stat().
+        """
+        stat = self.file_path.stat()
+        manifest = self._read_manifest()
+        source = manifest.get(str(self.file_path.resolve()))
+        recorded = bool(source) and source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns
+        digest = source["sha1"] if recorded else file_digest(self.file_path)
+        return cache_key(digest), digest, stat, recorded
+
+    def remember(self, key, digest, stat):
+        """Record the file's current size and mtime for an entry that is already stored."""
+        manifest = self._read_manifest()
+        self._record(manifest, key, digest, stat)
+        self._write_manifest(manifest)
+
+    def load(self, key):
+        """Load a cached entry, memory-mapping the scaled matrix."""
+        entry = self.cache_dir / key
+        try:
+            df = pd.read_pickle(entry / "frame.pkl")
+            X_scaled = np.load(entry / "X_scaled.npy", mmap_mode="r")
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Truncated, or written by incompatible code: rebuild it
+            return None
+        return PreparedData(df, X_scaled, key)
+
+    def store(self, key, digest, stat, df, X_scaled):
+        """Write an entry atomically and drop entries for older versions."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.cache_dir / key
+        tmp = self.cache_dir / f"{key}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        df.to_pickle(tmp / "frame.pkl")
+        np.save(tmp / "X_scaled.npy", np.ascontiguousarray(X_scaled))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+        manifest = self._read_manifest()
+        self._record(manifest, key, digest, stat)
+        self._write_manifest(manifest)
+
+        live_keys = {source["key"] for source in manifest.values()}
+        for child in self.cache_dir.iterdir():
+            if child.is_dir() and child.name not in live_keys:
+                shutil.rmtree(child, ignore_errors=True)
+
+    def invalidate(self):
+        """Drop every prepared entry, e.g. after the cluster model was refitted."""
+        if not self.cache_dir.is_dir():
+            return
+        for child in self.cache_dir.iterdir():
+            if child.is_dir():
+                shutil.rmtree(child, ignore_errors=True)
+        self.manifest_path.unlink(missing_ok=True)
+
+
+def load_prepared(file_path, cache_dir=None, use_cache=True):
+    """Return the prepared dataset, from the cache when it is still valid."""
+    if not use_cache:
+        df, X_scaled = prepare_dataset(file_path)
+        return PreparedData(df, X_scaled, cache_key(file_digest(file_path)))
+
+    cache = DatasetCache(file_path, cache_dir)
+    key, digest, stat, recorded = cache.current_key()
+    prepared = cache.load(key)
+    if prepared is not None:
+        if not recorded:
+            # Same content with a new mtime (touch, checkout): record it so
+            # later launches skip the hash again
+            try:
+                cache.remember(key, digest, stat)
+            except OSError as e:
+                print(f"Could not update dataset cache manifest: {e}")
+        return prepared
+
+    df, X_scaled = prepare_dataset(file_path)
+    try:
+        cache.store(key, digest, stat, df, X_scaled)
+    except OSError as e:
+        # A read-only data directory should not stop the app from starting
+        print(f"Could not write dataset cache: {e}")
+    return PreparedData(df, X_scaled, key)
@@ -0,0 +1,494 @@
+"""Scoring, filtering, selection and similarity without a GUI.
+
+``TeamEngine`` owns the prepared dataset and every index built from it, and
+answers lineup and similar-player queries from plain parameter dicts. It
+never imports Tk, so it backs both the desktop app (``team.py``) and the
+JSON service (``service.py``).
+
+After ``load_data`` the engine is read-only apart from its thread-safe
+result cache, so one engine can serve concurrent requests from several
+threads. Deterministic queries (Optimal lineups, seeded lineups and samples,
+similar players) are memoised per dataset version in ``engine.results``;
+reloading the data empties it.
+"""
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_cache import load_prepared
+from filter_index import FilterIndex
+from memo import ResultCache
+from name_index import NameIndex
+from optimizer import select_optimal_xi
+from player_table import PlayerTable
+from roles import ROLES, RoleIndex
+from sampler import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_SAMPLES,
+    DEFAULT_TEMPERATURE,
+    sample_lineups,
+    summarize,
+)
+from similarity import SimilarityIndex
+from tactics import TACTICS, TacticScores, TacticTuner, load_tactics
+
+DEFAULT_DATA_PATH = Path(__file__).resolve().parent / "data.csv"
+# In-house tactics next to the data file are added to (or replace) TACTICS
+TACTICS_FILE = "tactics.json"
+
+FORMATIONS = ["4-3-3", "3-5-2", "4-4-2", "4-2-3-1", "3-4-3"]
+SELECTION_MODES = ["Top-3 Sampling", "Optimal", "Monte Carlo"]
+# Grouped best XIs: label -> table column, or 'age_band' for AGE_BANDS
+GROUP_BY = {'Club': 'Team', 'Nation': 'Nation', 'Age band': 'age_band'}
+AGE_BANDS = [(15, 20), (21, 24), (25, 28), (29, 32), (33, 40)]
+
+# Same defaults as the GUI controls
+DEFAULT_PARAMS = {
+    'tactic': 'balanced',
+    'formation': '4-3-3',
+    'selection_mode': 'Top-3 Sampling',
+    'min_age': None,
+    'max_age': None,
+    'nation': None,
+    'team': None,
+    'exclude_injured': False,
+    'exclude_suspended': False,
+    'min_minutes': None,
+    'max_per_club': None,
+    # Cluster labels candidates must belong to; None for every cluster
+    'clusters': None,
+    # Monte Carlo mode
+    'samples': DEFAULT_SAMPLES,
+    'pool_size': DEFAULT_POOL_SIZE,
+    'temperature': DEFAULT_TEMPERATURE,
+}
+SAMPLING_PARAMS = ('samples', 'pool_size', 'temperature')
+
+# summary: see sampler.summarize; frames carry pos_group and performance_score
+SquadDistribution = namedtuple("SquadDistribution", ["summary", "best", "median", "frequencies"])
+
+# summary: one row per group (total_score, players, complete), best first;
+# players: every selected player with group, pos_group and performance_score
+GroupedTeams = namedtuple("GroupedTeams", ["summary", "players"])
+
+
+def make_params(overrides=None, tactics=None):
+    """Return a full parameter dict from ``DEFAULT_PARAMS`` and ``overrides``.
+
+    ``tactics`` are the known tactics (default ``TACTICS``; pass
+    ``engine.tactics`` to accept in-house ones). Raises ValueError for
+    unknown keys, tactics, formations or modes.
+    """
+    tactics = TACTICS if tactics is None else tactics
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    params = dict(DEFAULT_PARAMS, **overrides)
+    if params['tactic'] not in tactics:
+        raise ValueError(f"Unknown tactic '{params['tactic']}'. Choose from: {', '.join(tactics)}")
+    if params['selection_mode'] not in SELECTION_MODES:
+        raise ValueError(f"Unknown selection mode '{params['selection_mode']}'")
+    if params['clusters'] is not None:
+        try:
+            params['clusters'] = [int(label) for label in params['clusters']]
+        except (TypeError, ValueError):
+            raise ValueError("'clusters' must be a list of cluster numbers") from None
+    try:
+        params['samples'] = int(params['samples'])
+        params['pool_size'] = int(params['pool_size'])
+        params['temperature'] = float(params['temperature'])
+    except (TypeError, ValueError):
+        raise ValueError("'samples', 'pool_size' and 'temperature' must be numbers") from None
+    if params['samples'] < 1 or params['pool_size'] < 1 or params['temperature'] < 0:
+        raise ValueError("'samples' and 'pool_size' must be positive and 'temperature' not negative")
+    if params['max_per_club'] is not None:
+        try:
+            params['max_per_club'] = int(params['max_per_club'])
+        except (TypeError, ValueError):
+            raise ValueError("'max_per_club' must be a number") from None
+        if params['max_per_club'] < 1:
+            raise ValueError("'max_per_club' must be at least 1 (leave it empty for no limit)")
+    try:
+        parse_formation(params['formation'])
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid formation '{params['formation']}'") from None
+    return params
+
+
+def params_key(params, sampling=None):
+    """Hashable form of a parameter dict, for cache keys.
+
+    ``SAMPLING_PARAMS`` are only part of the key when ``sampling`` is true,
+    by default in Monte Carlo mode, so other modes share one entry.
+    """
+    if sampling is None:
+        sampling = params['selection_mode'] == "Monte Carlo"
+    return tuple(sorted(
+        (name, tuple(sorted(value)) if isinstance(value, list) else value)
+        for name, value in params.items()
+        if sampling or name not in SAMPLING_PARAMS
+    ))
+
+
+def parse_formation(formation):
+    """'4-3-3' -> [4, 3, 3]"""
+    return [int(num) for num in formation.split('-')]
+
+
+def top_ranked(candidates, scores, k):
+    """The ``k`` best of ``candidates`` (ascending ids) by ``scores``, best first.
+
+    Same order as a stable sort of all of them, ties included, but only the
+    candidates scoring at least the k-th best score are sorted.
+    """
+    if len(candidates) > k:
+        kth = np.partition(-scores[candidates], k - 1)[k - 1]
+        candidates = candidates[-scores[candidates] <= kth]
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+
+class TeamEngine:
+    def __init__(self, file_path=None, load=True):
+        self.tactics = TACTICS
+        self.tactic_scores = None
+        self.similarity_index = None
+        self.results = ResultCache()
+        if load:
+            self.load_data(file_path or DEFAULT_DATA_PATH)
+
+    def load_data(self, file_path):
+        # Load data (served from the on-disk cache when data.csv is unchanged)
+        prepared = load_prepared(file_path)
+        self.X_scaled = prepared.X_scaled
+        self.data_version = prepared.version
+        self.results.clear()
+
+        # Compact storage; self.df is a frame over the same memory
+        self.table = PlayerTable(prepared.df)
+        self.df = self.table.frame
+
+        # Filter indexes and the arrays generate_team scores from
+        self.filter_index = FilterIndex(self.df)
+        self.pos_group_codes = self.table.codes('pos_group')
+        self.roles = RoleIndex(self.table)
+        self.names = NameIndex(self.df['Player'])
+        self.clusters = self.df['cluster'].to_numpy()
+
+        # Every player under every tactic, recompiled only when the dataset
+        # or the tactic definitions change
+        tactics_path = Path(file_path).with_name(TACTICS_FILE)
+        tactics = load_tactics(tactics_path) if tactics_path.exists() else TACTICS
+        if (self.tactic_scores is None or self.tactic_scores.version != self.data_version
+                or tactics != self.tactics):
+            self.tactic_scores = TacticScores(self.table, tactics, self.data_version)
+        self.tactics = tactics
+
+        # Similarity lookups are rebuilt only when the dataset changes
+        if self.similarity_index is None or self.similarity_index.version != self.data_version:
+            self.similarity_index = SimilarityIndex(self.df, self.data_version, members=self.roles.members)
+
+    def warm(self):
+        """Build every lazily-built index now, e.g. before serving threads."""
+        for pos_group in self.table.categories('pos_group'):
+            self.similarity_index.group(pos_group)
+        for role in ROLES:
+            self.similarity_index.group(role)
+
+    def score(self, rows, tactic):
+        """Tactic-weighted performance scores for frame positions ``rows``."""
+        return self.tactic_scores.scores(rows, tactic)
+
+    def tuner(self, tactic):
+        """A TacticTuner for live weight changes to ``tactic``."""
+        return TacticTuner(self.tactic_scores, tactic)
+
+    def filtered_rows(self, params):
+        """Ids of the players passing the filters in ``params``."""
+        # Apply filters as bitmap intersections over the precomputed indexes
+        return self.filter_index.query(
+            min_age=params['min_age'],
+            max_age=params['max_age'],
+            nation=params['nation'],
+            team=params['team'],
+            exclude_injured=params['exclude_injured'],
+            exclude_suspended=params['exclude_suspended'],
+            min_minutes=params['min_minutes'],
+            clusters=params['clusters']
+        )
+
+    def candidates(self, params, scores=None):
+        """Filtered player ids, their scores and the players needed per position.
+
+        ``scores`` optionally replaces the tactic's scores with one score per
+        player id (for example ``TacticTuner.scores``).
+        """
+        # Get selected tactic and formation
+        formation = parse_formation(params['formation'])
+        rows = self.filtered_rows(params)
+
+        # Calculate performance scores for the candidate rows only
+        scores = self.score(rows, params['tactic']) if scores is None else scores[rows]
+
+        positions_needed = {'GK': 1, 'DF': formation[0], 'MF': formation[1], 'FW': formation[2]}
+        return rows, scores, positions_needed
+
+    def generate_team(self, params, rng=None, seed=None, scores=None):
+        """Build a team from a parameter dict (see ``DEFAULT_PARAMS``).
+
+        Returns a copy of the selected rows with a ``performance_score``
+        column. Raises ValueError with a user-facing message when the
+        filters leave too few players. ``rng`` is a numpy Generator or the
+        ``np.random`` module (the default) used for Top-3 sampling; an
+        integer ``seed`` makes the draw repeatable and lets the result be
+        cached. Optimal lineups are always cached. ``scores`` as for
+        ``candidates``; such lineups are never cached.
+        """
+        if seed is not None:
+            rng = np.random.default_rng(seed)
+        if scores is not None:
+            # Tuned weights are not part of the cache key
+            return self._generate_team(params, rng, scores)
+        if seed is None and params['selection_mode'] != "Optimal":
+            # Unseeded sampling should give a fresh lineup every time
+            return self._generate_team(params, rng)
+        if params['selection_mode'] == "Optimal":
+            seed = None
+        key = ('team', self.data_version, params_key(params), seed)
+        return self.results.get(key, lambda: self._generate_team(params, rng)).copy()
+
+    def _generate_team(self, params, rng, scores=None):
+        rng = np.random if rng is None else rng
+        if params['selection_mode'] == "Monte Carlo":
+            # The best of many sampled lineups
+            return self._sample_teams(params, rng, scores).best
+
+        rows, scores, positions_needed = self.candidates(params, scores)
+        if params['selection_mode'] == "Optimal":
+            # Exact solve over every eligible player
+            team_rows, team_positions, team_scores = select_optimal_xi(
+                self.df,
+                rows,
+                scores,
+                positions_needed,
+                max_per_club=params['max_per_club'],
+                masks=self.roles.masks[rows]
+            )
+
+            team = self.table.rows(team_rows)
+            team['pos_group'] = team_positions
+            team['performance_score'] = team_scores
+            return team
+
+        # Select team; multi-role players are eligible for each of their
+        # roles but fill at most one slot
+        team_rows = []
+        team_scores = []
+        team_positions = []
+        taken = np.zeros(len(rows), dtype=bool)
+
+        for pos, count in positions_needed.items():
+            # Get all players still available for this position
+            in_pos = np.flatnonzero(self.roles.eligible(rows, pos) & ~taken)
+
+            if len(in_pos) < count:
+                # Not enough players for this position
+                raise ValueError(
+                    f"Not enough {pos} players available with current filters. "
+                    f"Please adjust filters or try a different formation."
+                )
+
+            # Sort the best by performance score; no more than the top 3
+            # plus `count` are ever read
+            in_pos = top_ranked(in_pos, scores, count + 3)
+
+            # Randomly select players from the top 3 performers
+            top_players = in_pos[:3]
+            selected = rng.choice(top_players, size=min(count, len(top_players)), replace=False)
+
+            # If we need more players, add them from the remaining pool
+            if len(selected) < count:
+                selected = np.concatenate([selected, in_pos[3:3 + count - len(selected)]])
+
+            taken[selected] = True
+            team_rows.append(rows[selected])
+            team_scores.append(scores[selected])
+            team_positions.extend([pos] * len(selected))
+
+        team = self.table.rows(np.concatenate(team_rows))
+        team['pos_group'] = team_positions
+        team['performance_score'] = np.concatenate(team_scores)
+        return team
+
+    def sample_teams(self, params, rng=None, seed=None):
+        """Draw ``params['samples']`` lineups at once; return a SquadDistribution.
+
+        ``best`` and ``median`` are the sampled lineups with the highest and
+        the median total score; ``frequencies`` lists every sampled player by
+        how often they were picked. Same filters, errors and ``seed``
+        caching as generate_team.
+        """
+        if seed is None:
+            return self._sample_teams(params, rng)
+        key = ('sample', self.data_version, params_key(params, sampling=True), seed)
+        result = self.results.get(key, lambda: self._sample_teams(params, np.random.default_rng(seed)))
+        return SquadDistribution(
+            dict(result.summary), result.best.copy(), result.median.copy(), result.frequencies.copy()
+        )
+
+    def _sample_teams(self, params, rng, scores=None):
+        rows, scores, positions_needed = self.candidates(params, scores)
+        # Multi-role players are eligible for each of their roles; the
+        # sampler never draws one for two slots of a lineup
+        result = sample_lineups(
+            rows,
+            scores,
+            self.roles.masks[rows],
+            positions_needed,
+            n_samples=params['samples'],
+            pool_size=params['pool_size'],
+            temperature=params['temperature'],
+            rng=rng,
+        )
+        summary = summarize(result)
+        rates = summary['selection_rate']
+
+        def lineup(sample):
+            ids = result.lineups[sample]
+            team = self.table.rows(ids)
+            team['pos_group'] = result.positions
+            team['performance_score'] = [result.player_scores[i] for i in ids.tolist()]
+            team['selection_rate'] = [rates[i] for i in ids.tolist()]
+            return team
+
+        ids = sorted(rates, key=rates.get, reverse=True)
+        frequencies = self.table.rows(ids)
+        frequencies['performance_score'] = [result.player_scores[i] for i in ids]
+        frequencies['selection_rate'] = [rates[i] for i in ids]
+        return SquadDistribution(
+            summary,
+            lineup(summary['best_sample']),
+            lineup(summary['median_sample']),
+            frequencies,
+        )
+
+    def best_xi_by(self, params, group_by):
+        """The best XI of every club, nation or age band (``GROUP_BY``) at once.
+
+        Fills the positions in order (GK, DF, MF, FW), each with one sort of
+        the still-available players eligible for it, taking the top scorers
+        within every group at once, rather than one filtered run per group.
+        Multi-role players fill at most one slot. The filter on the grouped
+        column itself (club, nation or age range) is ignored;
+        ``selection_mode`` and ``max_per_club`` do not apply. Groups short of
+        players for some position are kept and flagged as incomplete.
+        Returns a GroupedTeams.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown grouping '{group_by}'. Choose from: {', '.join(GROUP_BY)}")
+        column = GROUP_BY[group_by]
+        formation = parse_formation(params['formation'])
+        needed = np.array([1, *formation[:3]])
+
+        rows = self.filter_index.query(
+            min_age=None if column == 'age_band' else params['min_age'],
+            max_age=None if column == 'age_band' else params['max_age'],
+            nation=None if column == 'Nation' else params['nation'],
+            team=None if column == 'Team' else params['team'],
+            exclude_injured=params['exclude_injured'],
+            exclude_suspended=params['exclude_suspended'],
+            min_minutes=params['min_minutes'],
+            clusters=params['clusters']
+        )
+        if column == 'age_band':
+            labels = [f"{low}-{high}" for low, high in AGE_BANDS]
+            ages = self.table.stat('Age')[rows]
+            groups = np.full(len(rows), -1)
+            for band, (low, high) in enumerate(AGE_BANDS):
+                groups[(ages >= low) & (ages <= high)] = band
+        else:
+            labels = list(self.table.categories(column))
+            groups = self.table.codes(column)[rows]
+
+        keep = groups >= 0
+        rows, groups = rows[keep], groups[keep]
+        scores = self.score(rows, params['tactic'])
+
+        # Per position, sort the available eligible players by group, then
+        # score (best first); the rank within their group's run decides
+        taken = np.zeros(len(rows), dtype=bool)
+        selected = []
+        positions = []
+        for position, (pos, count) in enumerate(zip(ROLES, needed)):
+            candidates = np.flatnonzero(self.roles.eligible(rows, pos) & ~taken)
+            ranked = candidates[np.lexsort((-scores[candidates], groups[candidates]))]
+            starts = np.r_[True, groups[ranked][1:] != groups[ranked][:-1]]
+            index = np.arange(len(ranked))
+            rank = index - np.maximum.accumulate(np.where(starts, index, 0))
+            chosen = ranked[rank < count]
+            taken[chosen] = True
+            selected.append(chosen)
+            positions.append(np.full(len(chosen), position))
+        positions = np.concatenate(positions)
+        # Group by group, keeping the GK, DF, MF, FW order within each
+        by_group = np.argsort(groups[np.concatenate(selected)], kind='stable')
+        selected = np.concatenate(selected)[by_group]
+        positions = positions[by_group]
+
+        players = self.table.rows(rows[selected])
+        players.insert(0, 'group', [labels[group] for group in groups[selected]])
+        players['pos_group'] = [ROLES[position] for position in positions]
+        players['performance_score'] = scores[selected]
+
+        filled = np.bincount(groups[selected], minlength=len(labels))
+        totals = np.bincount(groups[selected], weights=scores[selected], minlength=len(labels))
+        summary = pd.DataFrame({
+            'group': labels,
+            'total_score': totals,
+            'players': filled,
+            'complete': filled == needed.sum(),
+        })
+        summary = summary[summary['players'] > 0]
+        summary = summary.sort_values(['complete', 'total_score'], ascending=False, kind='stable')
+        return GroupedTeams(summary.reset_index(drop=True), players)
+
+    def search_players(self, query, limit=10):
+        """Players whose name matches ``query`` as typed (see ``name_index``), best first."""
+        return self.table.rows(self.names.search(query, limit))
+
+    def find_player(self, name):
+        """Return the first frame row for ``name``, or None."""
+        ids = self.table.ids_of('Player', name)
+        return self.df.iloc[ids[0]] if len(ids) else None
+
+    def compute_similar_players(self, player, tactic, n=5, same_cluster=False, scores=None):
+        """Return the ``n`` players most similar to ``player`` (a frame row).
+
+        Adds ``similarity`` and ``performance_score`` (under ``tactic``)
+        columns to a copy of their rows. With ``same_cluster`` only players
+        from the same stat cluster are considered. ``scores`` as for
+        ``candidates`` (tuned weights); otherwise results are cached.
+        """
+        if scores is not None:
+            return self._similar_players(player, tactic, n, same_cluster, scores)
+        key = ('similar', self.data_version, player.name, tactic, n, bool(same_cluster))
+        return self.results.get(
+            key, lambda: self._similar_players(player, tactic, n, same_cluster)
+        ).copy()
+
+    def _similar_players(self, player, tactic, n, same_cluster, scores=None):
+        allowed = None
+        if same_cluster:
+            allowed = self.clusters == player['cluster']
+
+        # Look up the precomputed neighbours for this player's position group
+        rows, similarities = self.similarity_index.query(player, n, allowed=allowed)
+
+        similar_df = self.table.rows(rows)
+        similar_df['similarity'] = similarities
+
+        # Calculate performance score for similar players
+        similar_df['performance_score'] = self.score(rows, tactic) if scores is None else scores[rows]
+        return similar_df
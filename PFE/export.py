@@ -0,0 +1,174 @@
+"""Off-screen export of lineup graphics.
+
+Renders the formation pitch and the performance chart of every lineup in a
+``batch.py`` JSON report to PNG, SVG and/or PDF files, with matplotlib's
+non-interactive backends and no Tk. Lineups are spread across a process
+pool; each worker builds its two figures once and redraws them per lineup
+(the pitch only moves the player artists that changed).
+
+Example:
+
+    python batch.py --clubs '*' --mode Optimal -o report.json
+    python export.py report.json -o graphics --formats png,svg
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from engine import parse_formation
+
+FORMATS = ['png', 'svg', 'pdf']
+CHARTS = ['formation', 'performance']
+FIGURE_SIZE = (10, 7)
+DEFAULT_DPI = 100
+# Fixed margins in place of the GUI's per-draw tight_layout, which costs a
+# full extra render per chart; wide enough for the longest player names
+PERFORMANCE_MARGINS = dict(left=0.2, right=0.95, bottom=0.07, top=0.9)
+
+# Per-process figures, set by init_worker
+_renderer = None
+
+
+class LineupRenderer:
+    """One formation and one performance figure, redrawn for each lineup."""
+
+    def __init__(self, out_dir, formats, charts, dpi=DEFAULT_DPI):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        from font_bootstrap import FONT_FAMILY, locate_font, register_matplotlib_font
+        from pitch import BACKGROUND_COLOR, FormationPitch
+
+        self.out_dir = Path(out_dir)
+        self.formats = formats
+        self.charts = charts
+        self.dpi = dpi
+
+        font_path = locate_font()
+        self.font_family = FONT_FAMILY if font_path and register_matplotlib_font(font_path) else 'sans-serif'
+
+        self.fig_formation = Figure(figsize=FIGURE_SIZE, facecolor=BACKGROUND_COLOR)
+        FigureCanvasAgg(self.fig_formation)
+        self.pitch = FormationPitch(self.fig_formation.add_subplot(111), None, font_family=self.font_family)
+
+        self.fig_performance = Figure(figsize=FIGURE_SIZE, facecolor=BACKGROUND_COLOR)
+        FigureCanvasAgg(self.fig_performance)
+        self.ax_performance = self.fig_performance.add_subplot(111)
+        self.fig_performance.subplots_adjust(**PERFORMANCE_MARGINS)
+
+    def render(self, result):
+        """Write the graphics of one report result; return the paths written."""
+        from charts import draw_performance
+
+        params = result['params']
+        team = lineup_frame(result['players'])
+        stem = f"{result['job']:05d}-{params['tactic']}-{params['formation']}"
+        paths = []
+
+        if 'formation' in self.charts:
+            self.pitch.set_title(
+                f"Optimal Team - {params['tactic'].capitalize()} Tactic - Formation {params['formation']}"
+            )
+            self.pitch.show_team(team, parse_formation(params['formation']))
+            paths.extend(self.save(self.fig_formation, f"{stem}-formation"))
+
+        if 'performance' in self.charts:
+            draw_performance(self.ax_performance, team, self.font_family)
+            paths.extend(self.save(self.fig_performance, f"{stem}-performance"))
+        return paths
+
+    def save(self, figure, stem):
+        paths = []
+        for fmt in self.formats:
+            path = self.out_dir / f"{stem}.{fmt}"
+            figure.savefig(path, format=fmt, dpi=self.dpi, facecolor=figure.get_facecolor())
+            paths.append(str(path))
+        return paths
+
+
+def lineup_frame(players):
+    """The team frame the pitch and chart expect, from report player records."""
+    return pd.DataFrame({
+        'Player': [player['player'] for player in players],
+        'Pos': [player['pos'] for player in players],
+        'pos_group': [player['pos_group'] for player in players],
+        'Team': [player['club'] for player in players],
+        'performance_score': [player['performance_score'] for player in players],
+    })
+
+
+def init_worker(out_dir, formats, charts, dpi):
+    global _renderer
+    _renderer = LineupRenderer(out_dir, formats, charts, dpi)
+
+
+def render_job(result):
+    """Render one lineup; never raises, failures are returned as messages."""
+    try:
+        return _renderer.render(result), None
+    except Exception as e:
+        return [], f"job {result['job']}: {e}"
+
+
+def export_lineups(results, out_dir, formats=FORMATS[:1], charts=CHARTS, dpi=DEFAULT_DPI,
+                   workers=None, chunksize=None):
+    """Render every successful result; return (paths written, error messages)."""
+    results = [result for result in results if result['status'] == 'ok']
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    initargs = (str(out_dir), list(formats), list(charts), dpi)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(results) < 2:
+        init_worker(*initargs)
+        outcomes = [render_job(result) for result in results]
+    else:
+        chunksize = chunksize or max(1, len(results) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as pool:
+            outcomes = list(pool.map(render_job, results, chunksize=chunksize))
+
+    paths = [path for written, _ in outcomes for path in written]
+    errors = [error for _, error in outcomes if error]
+    return paths, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render lineup graphics from a batch.py JSON report")
+    parser.add_argument("report", help="JSON report written by batch.py")
+    parser.add_argument("-o", "--output", required=True, help="directory for the graphics")
+    parser.add_argument("--formats", default="png", help=f"comma separated, from {', '.join(FORMATS)}")
+    parser.add_argument("--charts", default=",".join(CHARTS), help=f"comma separated, from {', '.join(CHARTS)}")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+    charts = [chart.strip().lower() for chart in args.charts.split(',') if chart.strip()]
+    if not formats or set(formats) - set(FORMATS):
+        parser.error(f"--formats must be from {', '.join(FORMATS)}")
+    if not charts or set(charts) - set(CHARTS):
+        parser.error(f"--charts must be from {', '.join(CHARTS)}")
+
+    try:
+        with open(args.report, encoding='utf-8') as fh:
+            results = json.load(fh)['results']
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"Could not read report {args.report}: {e}")
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Rendering {len(results)} lineups on {workers} worker(s)...", file=sys.stderr)
+    start = time.perf_counter()
+    paths, errors = export_lineups(results, args.output, formats, charts, args.dpi, workers)
+    for error in errors:
+        print(f"Failed: {error}", file=sys.stderr)
+    print(f"{len(paths)} files written to {args.output} in {time.perf_counter() - start:.2f} s",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
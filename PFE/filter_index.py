@@ -0,0 +1,94 @@
+"""Precomputed indexes for the player filters.
+
+Built once per dataset. Range filters (age, minutes) are answered from a
+sorted copy of the column with two binary searches; Nation/Team values and
+the availability flags each map to a packed bitmap of matching rows. A query
+ANDs the bitmaps together and returns the matching row positions, without
+copying or scanning the frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.all_rows = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+        self.ranges = {}
+        for column in ('Age', 'Min'):
+            values = df[column].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self.ranges[column] = (values[order], order)
+
+        self.categories = {
+            'Nation': self._category_bitmaps(df['Nation']),
+            'Team': self._category_bitmaps(df['Team']),
+        }
+        # Cluster labels double as a coarse candidate pre-filter
+        if 'cluster' in df.columns:
+            self.categories['cluster'] = self._category_bitmaps(df['cluster'])
+
+        # Rows that are *not* flagged, keyed by flag column
+        self.available = {}
+        for column in ('Injured', 'Suspended'):
+            if column in df.columns:
+                self.available[column] = np.packbits((df[column] != True).to_numpy())
+
+    def _category_bitmaps(self, series):
+        codes, uniques = pd.factorize(series, sort=False)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            bitmaps[value] = self._bitmap(order[bounds[code]:bounds[code + 1]])
+        return bitmaps
+
+    def _bitmap(self, rows):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def range_bitmap(self, column, low=None, high=None):
+        """Bitmap of rows with ``low <= column <= high`` (either bound optional)."""
+        sorted_values, order = self.ranges[column]
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        stop = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+        return self._bitmap(order[start:stop])
+
+    def category_bitmap(self, column, value):
+        bitmap = self.categories.get(column, {}).get(value)
+        return bitmap if bitmap is not None else np.zeros_like(self.all_rows)
+
+    def query(self, min_age=None, max_age=None, nation=None, team=None,
+              exclude_injured=False, exclude_suspended=False, min_minutes=None,
+              clusters=None):
+        """Return the sorted row positions that pass every given filter.
+
+        ``clusters`` is a collection of cluster labels; rows in any of them pass.
+        """
+        bitmaps = []
+        if min_age is not None or max_age is not None:
+            bitmaps.append(self.range_bitmap('Age', min_age, max_age))
+        if min_minutes is not None:
+            bitmaps.append(self.range_bitmap('Min', min_minutes))
+        if nation is not None:
+            bitmaps.append(self.category_bitmap('Nation', nation))
+        if team is not None:
+            bitmaps.append(self.category_bitmap('Team', team))
+        if clusters is not None:
+            in_clusters = np.zeros_like(self.all_rows)
+            for label in clusters:
+                in_clusters = in_clusters | self.category_bitmap('cluster', label)
+            bitmaps.append(in_clusters)
+        if exclude_injured and 'Injured' in self.available:
+            bitmaps.append(self.available['Injured'])
+        if exclude_suspended and 'Suspended' in self.available:
+            bitmaps.append(self.available['Suspended'])
+
+        if not bitmaps:
+            return np.arange(self.n_rows)
+        combined = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            combined = combined & bitmap
+        return np.flatnonzero(np.unpackbits(combined, count=self.n_rows))
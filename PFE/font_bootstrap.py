@@ -0,0 +1,130 @@
+"""Locate, register and (if needed) fetch the Poppins font.
+
+The font is looked up next to this module first (``PFE/fonts``), then in a
+per-user cache directory. Registration with the OS font system (for Tk) and
+with matplotlib happens at most once per file. A missing font is downloaded
+on a background thread with a timeout; until it arrives, or if the machine is
+offline, the app uses ``FALLBACK_FAMILY``.
+"""
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+from pathlib import Path
+
+FONT_FAMILY = "Poppins"
+FONT_FILE = "Poppins-Regular.ttf"
+FONT_URL = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
+BUNDLED_FONT_DIR = Path(__file__).resolve().parent / "fonts"
+FALLBACK_FAMILY = "Helvetica"
+DOWNLOAD_TIMEOUT_S = 10
+
+# Set TEAM_BUILDER_OFFLINE=1 to never attempt the download
+OFFLINE_ENV_VAR = "TEAM_BUILDER_OFFLINE"
+
+_lock = threading.Lock()
+_tk_registered = {}
+_mpl_registered = set()
+
+
+def user_font_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "team-builder" / "fonts"
+
+
+def locate_font():
+    """Return the path of the Poppins TTF, or None if it is not on disk."""
+    for directory in (BUNDLED_FONT_DIR, user_font_dir()):
+        path = directory / FONT_FILE
+        if path.is_file():
+            return path
+    return None
+
+
+def _register_with_os(path):
+    """Make a TTF visible to Tk without installing it system-wide."""
+    if sys.platform == "win32":
+        FR_PRIVATE = 0x10
+        return ctypes.windll.gdi32.AddFontResourceExW(str(path), FR_PRIVATE, 0) > 0
+    library = ctypes.util.find_library("fontconfig")
+    if library is None:
+        return False
+    fontconfig = ctypes.CDLL(library)
+    fontconfig.FcConfigAppFontAddFile.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+    return bool(fontconfig.FcConfigAppFontAddFile(None, os.fsencode(path)))
+
+
+def register_tk_font(path):
+    """Register ``path`` for Tk once; returns whether registration worked."""
+    key = str(Path(path).resolve())
+    with _lock:
+        if key not in _tk_registered:
+            try:
+                _tk_registered[key] = _register_with_os(key)
+            except (OSError, AttributeError) as e:
+                print(f"Could not register font {key}: {e}")
+                _tk_registered[key] = False
+        return _tk_registered[key]
+
+
+def register_matplotlib_font(path):
+    """Add ``path`` to matplotlib's font manager once."""
+    key = str(Path(path).resolve())
+    with _lock:
+        if key in _mpl_registered:
+            return True
+        from matplotlib import font_manager
+        try:
+            font_manager.fontManager.addfont(key)
+        except (OSError, RuntimeError) as e:
+            print(f"Could not load font {key} into matplotlib: {e}")
+            return False
+        _mpl_registered.add(key)
+        return True
+
+
+def tk_font_family(root):
+    """Return FONT_FAMILY if Tk can use it, otherwise FALLBACK_FAMILY."""
+    from tkinter import font
+    return FONT_FAMILY if FONT_FAMILY in font.families(root) else FALLBACK_FAMILY
+
+
+def download_font(timeout=DOWNLOAD_TIMEOUT_S):
+    """Download the font into the user font directory and return its path."""
+    import requests
+
+    response = requests.get(FONT_URL, timeout=timeout)
+    response.raise_for_status()
+    directory = user_font_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / FONT_FILE
+    tmp = path.with_suffix(".part")
+    tmp.write_bytes(response.content)
+    os.replace(tmp, path)
+    return path
+
+
+def fetch_font_async(on_ready, timeout=DOWNLOAD_TIMEOUT_S):
+    """Download the font on a daemon thread and call ``on_ready(path)``.
+
+    ``on_ready`` runs on the worker thread, so GUI callers must not touch
+    Tk from it: pass something thread-safe such as ``queue.Queue.put`` and
+    poll it from the Tk thread. Returns the thread; nothing is started (and
+    None is returned) when offline mode is set, and failures only print a
+    message.
+    """
+    if os.environ.get(OFFLINE_ENV_VAR):
+        return None
+
+    def worker():
+        try:
+            path = download_font(timeout)
+        except Exception as e:
+            print(f"Could not download {FONT_FAMILY} font, using {FALLBACK_FAMILY}: {e}")
+            return
+        on_ready(path)
+
+    thread = threading.Thread(target=worker, name="font-download", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,71 @@
+"""A single, reusable tooltip for hovering over plotted items.
+
+``ttkbootstrap.tooltip.ToolTip`` binds itself to a widget and builds a new
+window on every enter. For a matplotlib canvas, where one widget holds many
+hoverable items, ``HoverTip`` instead keeps one hidden window around; the
+hover handler calls ``show(key, text)`` and the label is only rewritten when
+``key`` (the hovered item) changes. Moving within the same item just moves
+the window.
+"""
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from ttkbootstrap import utility
+
+# Offset of the window from the mouse pointer, as in ttkbootstrap's ToolTip
+POINTER_OFFSET = (25, 10)
+
+
+class HoverTip:
+    def __init__(self, widget, bootstyle=None, wraplength=None, alpha=0.95):
+        self.widget = widget
+        self.key = None
+
+        ttk.Style().configure(
+            style="tooltip.TLabel",
+            background="#fffddd",
+            foreground="#333",
+            bordercolor="#888",
+            borderwidth=1,
+            darkcolor="#fffddd",
+            lightcolor="#fffddd",
+            relief=RAISED,
+        )
+        self.toplevel = ttk.Toplevel(master=widget, overrideredirect=True, alpha=alpha)
+        self.toplevel.withdraw()
+        self.label = ttk.Label(
+            master=self.toplevel,
+            justify=LEFT,
+            wraplength=wraplength or utility.scale_size(widget, 300),
+            padding=10,
+        )
+        self.label.pack(fill=BOTH, expand=YES)
+        if bootstyle:
+            self.label.configure(bootstyle=bootstyle)
+        else:
+            self.label.configure(style="tooltip.TLabel")
+
+        # Leaving the widget or clicking hides the tip, like ToolTip does
+        widget.bind("<Leave>", self.hide, add="+")
+        widget.bind("<ButtonPress>", self.hide, add="+")
+
+    def show(self, key, text):
+        """Show ``text`` for the item ``key`` next to the pointer.
+
+        ``text`` may be a callable; it is only called when ``key`` differs
+        from the item currently shown.
+        """
+        if key != self.key:
+            self.label.configure(text=text() if callable(text) else text)
+            self.key = key
+        x = self.widget.winfo_pointerx() + POINTER_OFFSET[0]
+        y = self.widget.winfo_pointery() + POINTER_OFFSET[1]
+        self.toplevel.geometry(f"+{x}+{y}")
+        if self.toplevel.state() == "withdrawn":
+            self.toplevel.deiconify()
+            self.toplevel.lift()
+
+    def hide(self, *_):
+        if self.key is None:
+            return
+        self.key = None
+        self.toplevel.withdraw()
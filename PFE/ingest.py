@@ -0,0 +1,468 @@
+"""Refresh ``data.csv`` from fbrapi.com.
+
+A refresh fetches, for each league and season, the list of clubs and then
+every club's player season stats. The fetches share one pooled
+``requests.Session`` and run concurrently. Every response is kept in an
+on-disk cache together with its ``ETag``/``Last-Modified`` validators, so
+later refreshes send conditional requests and an unchanged page costs a
+304 and no download.
+
+The fetched rows are merged into the existing CSV by (Player, Team): rows
+that are new are appended, and rows whose stats changed are updated in
+place. Columns the source does not provide keep their current values,
+except the derived and per-90 columns (``90s``, ``G+A``, ``Gls_90``, ...),
+which are recomputed for every added or updated row. Column dtypes are
+kept. The file is only rewritten, atomically, when at least one row
+changed, so the prepared-dataset cache stays valid after a no-op refresh.
+
+Sources are pluggable: anything with ``name``, ``index_request()``,
+``page_requests(index_payload)`` and ``records(payload, context)`` can be
+added to ``SOURCES``. Point ``--base-url`` at a local stub server to try a
+refresh without touching the real API.
+
+    python ingest.py --league 9 --season 2023-2024 [--data data.csv]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+
+from engine import DEFAULT_DATA_PATH
+
+DEFAULT_BASE_URL = "https://fbrapi.com"
+API_KEY_ENV_VAR = "FBRAPI_KEY"
+HTTP_CACHE_DIR_NAME = ".http_cache"
+DEFAULT_WORKERS = 8
+REQUEST_TIMEOUT_S = 30
+
+# A row is identified by these columns when merging
+KEY_COLUMNS = ['Player', 'Team']
+
+# Columns computed from the counting stats, as (added, subtracted) columns;
+# per-90 columns are further divided by the minutes played over 90
+DERIVED_COLUMNS = {
+    'G+A': (['Gls', 'Ast'], []),
+    'G-PK': (['Gls'], ['PK']),
+    'npxG+xAG': (['npxG', 'xAG'], []),
+}
+PER90_COLUMNS = {
+    'Gls_90': (['Gls'], []),
+    'Ast_90': (['Ast'], []),
+    'G+A_90': (['Gls', 'Ast'], []),
+    'G-PK_90': (['Gls'], ['PK']),
+    'G+A-PK_90': (['Gls', 'Ast'], ['PK']),
+    'xG_90': (['xG'], []),
+    'xAG_90': (['xAG'], []),
+    'xG+xAG_90': (['xG', 'xAG'], []),
+    'npxG_90': (['npxG'], []),
+    'npxG+xAG_90': (['npxG', 'xAG'], []),
+}
+
+PageRequest = namedtuple("PageRequest", ["url", "params", "context"])
+FetchResult = namedtuple("FetchResult", ["request", "payload", "changed"])
+MergeReport = namedtuple("MergeReport", ["added", "updated", "unchanged"])
+
+
+def make_session(pool_size=DEFAULT_WORKERS, retries=3, api_key=None):
+    """A Session whose connection pool fits ``pool_size`` concurrent requests.
+
+    Connection errors and 429/5xx responses are retried with backoff.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept"] = "application/json"
+    if api_key:
+        session.headers["X-API-Key"] = api_key
+    return session
+
+
+class ResponseCache:
+    """Response bodies and their validators, one pair of files per request."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(url, params=None):
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha1(f"{url}?{query}".encode()).hexdigest()
+
+    def get(self, key):
+        """Return (validators, body) or None."""
+        try:
+            meta = json.loads((self.directory / f"{key}.json").read_text())
+            body = (self.directory / f"{key}.body").read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def put(self, key, meta, body):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Body first, so a crash never leaves validators for a missing body
+        for suffix, data in (("body", body), ("json", json.dumps(meta).encode())):
+            path = self.directory / f"{key}.{suffix}"
+            tmp = path.with_name(f"{path.name}.tmp{os.getpid()}-{threading.get_ident()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+
+class ConditionalFetcher:
+    """GETs JSON through a shared session, revalidating cached responses.
+
+    ``min_interval`` spaces out request starts across all threads, for APIs
+    that rate-limit per key.
+    """
+
+    def __init__(self, session, cache, timeout=REQUEST_TIMEOUT_S, min_interval=0.0):
+        self.session = session
+        self.cache = cache
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._throttle_lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _throttle(self):
+        if not self.min_interval:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def fetch(self, request):
+        key = self.cache.key(request.url, request.params)
+        cached = self.cache.get(key)
+        headers = {}
+        if cached is not None:
+            meta, _ = cached
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        self._throttle()
+        response = self.session.get(request.url, params=request.params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            return FetchResult(request, json.loads(cached[1]), False)
+        response.raise_for_status()
+
+        body = response.content
+        # Servers without validators still get a cheap "unchanged" check
+        changed = cached is None or body != cached[1]
+        meta = {
+            "url": request.url,
+            "params": request.params,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        self.cache.put(key, meta, body)
+        return FetchResult(request, json.loads(body), changed)
+
+
+def _lookup(record, path):
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def nation_label(code):
+    """FBref-style nation, e.g. 'ENG' -> 'eng ENG'."""
+    return f"{code.lower()} {code.upper()}" if code else None
+
+
+class FbrApiSource:
+    """Player season stats for one league season from fbrapi.com.
+
+    The club list comes from ``/team-season-stats`` and each club's players
+    from ``/player-season-stats``. ``FIELD_PATHS`` maps dataset columns to
+    dotted paths inside a player record; adjust it if the API layout
+    changes.
+    """
+
+    name = "fbrapi"
+
+    FIELD_PATHS = {
+        'Player': 'meta_data.player_name',
+        'Nation': 'meta_data.player_country_code',
+        'Age': 'meta_data.age',
+        'Pos': 'stats.stats.positions',
+        'MP': 'stats.stats.matches_played',
+        'Starts': 'stats.stats.starts',
+        'Min': 'stats.stats.min',
+        'Gls': 'stats.stats.gls',
+        'Ast': 'stats.stats.ast',
+        'PK': 'stats.stats.pk_made',
+        'PKatt': 'stats.stats.pk_att',
+        'CrdY': 'stats.stats.yellow_cards',
+        'CrdR': 'stats.stats.red_cards',
+        'xG': 'stats.stats.xg',
+        'npxG': 'stats.stats.non_pen_xg',
+        'xAG': 'stats.stats.xag',
+        'PrgC': 'stats.stats.prgc',
+        'PrgP': 'stats.stats.prgp',
+        'PrgR': 'stats.stats.prgr',
+    }
+
+    def __init__(self, league_id, season_id, base_url=DEFAULT_BASE_URL):
+        self.league_id = league_id
+        self.season_id = season_id
+        self.base_url = base_url.rstrip("/")
+
+    def index_request(self):
+        return PageRequest(
+            f"{self.base_url}/team-season-stats",
+            {"league_id": self.league_id, "season_id": self.season_id},
+            {},
+        )
+
+    def page_requests(self, index_payload):
+        for team in index_payload.get("data", []):
+            meta = team.get("meta_data", {})
+            yield PageRequest(
+                f"{self.base_url}/player-season-stats",
+                {"team_id": meta["team_id"], "league_id": self.league_id, "season_id": self.season_id},
+                {"Team": meta.get("team_name")},
+            )
+
+    def records(self, payload, context):
+        for player in payload.get("players", payload.get("data", [])):
+            row = {column: _lookup(player, path) for column, path in self.FIELD_PATHS.items()}
+            if not row['Player']:
+                continue
+            row['Nation'] = nation_label(row['Nation'])
+            row.update(context)
+            yield row
+
+
+SOURCES = {FbrApiSource.name: FbrApiSource}
+
+
+def fetch_all(sources, fetcher, workers=DEFAULT_WORKERS):
+    """Fetch every source's index, then all of their pages, concurrently.
+
+    Returns (rows, pages fetched, pages that changed).
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        indexes = list(pool.map(lambda source: fetcher.fetch(source.index_request()), sources))
+        jobs = [
+            (source, request)
+            for source, index in zip(sources, indexes)
+            for request in source.page_requests(index.payload)
+        ]
+        pages = list(pool.map(lambda job: fetcher.fetch(job[1]), jobs))
+
+    rows = []
+    for (source, request), page in zip(jobs, pages):
+        rows.extend(source.records(page.payload, request.context))
+    changed = sum(result.changed for result in indexes + pages)
+    return rows, len(indexes) + len(pages), changed
+
+
+def _same(old, new):
+    """Element-wise equality that treats numbers as floats and NaN == NaN."""
+    old_num = pd.to_numeric(old, errors='coerce')
+    new_num = pd.to_numeric(new, errors='coerce')
+    numeric = old_num.notna() & new_num.notna()
+    same = np.where(
+        numeric,
+        np.isclose(old_num.fillna(0), new_num.fillna(0)),
+        (old.astype(str) == new.astype(str)) | (old.isna() & new.isna()),
+    )
+    return same
+
+
+def derived_columns(rows):
+    """The ``90s``, ``DERIVED_COLUMNS`` and ``PER90_COLUMNS`` values of ``rows``.
+
+    Only columns present in ``rows`` are computed. Per-90 values are 0 for
+    players without minutes.
+    """
+    def total(added, subtracted):
+        values = sum(pd.to_numeric(rows[col], errors='coerce') for col in added)
+        for col in subtracted:
+            values = values - pd.to_numeric(rows[col], errors='coerce')
+        return values
+
+    def computable(spec):
+        return all(col in rows.columns for col in spec[0] + spec[1])
+
+    derived = {}
+    for col, spec in DERIVED_COLUMNS.items():
+        if col in rows.columns and computable(spec):
+            derived[col] = total(*spec).round(2)
+    if 'Min' in rows.columns:
+        nineties = pd.to_numeric(rows['Min'], errors='coerce') / 90
+        if '90s' in rows.columns:
+            derived['90s'] = nineties.round(1)
+        for col, spec in PER90_COLUMNS.items():
+            if col in rows.columns and computable(spec):
+                per90 = total(*spec) / nineties.where(nineties > 0)
+                derived[col] = per90.where(nineties != 0, 0).round(2)
+    return pd.DataFrame(derived, index=rows.index)
+
+
+def restore_dtypes(df, like):
+    """Cast ``df``'s columns back to the dtypes of ``like``.
+
+    Integer columns that gained missing values become nullable integers, so
+    the CSV never picks up ``.0`` suffixes.
+    """
+    for col, dtype in like.dtypes.items():
+        if df[col].dtype == dtype:
+            continue
+        if dtype.kind in 'iu':
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype('Int64' if values.isna().any() else dtype)
+        elif dtype.kind == 'f':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return df
+
+
+def merge_players(existing, incoming, key_columns=KEY_COLUMNS):
+    """Merge ``incoming`` rows into ``existing``; return (merged, MergeReport).
+
+    Existing rows keep their position; only rows whose values for the
+    incoming columns differ are assigned. New keys are appended in the
+    existing column order. Derived columns are recomputed for the added and
+    updated rows (see ``derived_columns``), and every column keeps its dtype.
+    """
+    incoming = incoming.dropna(subset=key_columns).drop_duplicates(key_columns, keep='last')
+    columns = [col for col in incoming.columns if col in existing.columns and col not in key_columns]
+
+    position_of = {}
+    for position, key in enumerate(zip(*(existing[col] for col in key_columns))):
+        position_of.setdefault(key, position)
+    positions = np.array(
+        [position_of.get(key, -1) for key in zip(*(incoming[col] for col in key_columns))],
+        dtype=np.int64,
+    )
+
+    known = positions >= 0
+    matched = incoming[known].reset_index(drop=True)
+    merged = existing.copy()
+    # Missing values in the source mean "not provided", not "cleared"
+    updates = {}
+    changed = np.zeros(len(matched), dtype=bool)
+    for col in columns:
+        old = existing[col].iloc[positions[known]].reset_index(drop=True)
+        new = matched[col].where(matched[col].notna(), old)
+        updates[col] = new
+        changed |= ~_same(old, new)
+
+    rows = positions[known][changed]
+    if changed.any():
+        for col, new in updates.items():
+            values = new.to_numpy()[changed]
+            if merged[col].dtype.kind in 'iuf':
+                values = pd.to_numeric(values, errors='coerce')
+            else:
+                merged[col] = merged[col].astype(object)
+            merged.iloc[rows, merged.columns.get_loc(col)] = values
+
+    added = incoming[~known]
+    if len(added):
+        added = added.dropna(axis=1, how='all')
+        merged = pd.concat([merged, added], ignore_index=True)[existing.columns]
+
+    touched = np.concatenate([rows, np.arange(len(existing), len(merged))])
+    if len(touched):
+        derived = derived_columns(merged.iloc[touched])
+        for col in derived.columns:
+            merged[col] = merged[col].astype(np.float64)
+            merged.iloc[touched, merged.columns.get_loc(col)] = derived[col].to_numpy()
+    merged = restore_dtypes(merged, existing)
+    report = MergeReport(added=len(added), updated=int(changed.sum()), unchanged=int((~changed).sum()))
+    return merged, report
+
+
+def write_csv_atomic(df, path):
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def refresh(data_path, sources, fetcher, workers=DEFAULT_WORKERS):
+    """Fetch ``sources`` and merge them into the CSV at ``data_path``.
+
+    Returns (MergeReport, pages fetched, pages changed).
+    """
+    rows, fetched, changed_pages = fetch_all(sources, fetcher, workers)
+    existing = pd.read_csv(data_path)
+    incoming = pd.DataFrame(rows)
+    if incoming.empty:
+        return MergeReport(0, 0, 0), fetched, changed_pages
+
+    merged, report = merge_players(existing, incoming)
+    if report.added or report.updated:
+        write_csv_atomic(merged, data_path)
+    return report, fetched, changed_pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the player dataset from fbrapi.com")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH), help="CSV to merge into")
+    parser.add_argument("--source", default=FbrApiSource.name, choices=sorted(SOURCES))
+    parser.add_argument("--league", action="append", required=True,
+                        help="league id; repeat for several leagues")
+    parser.add_argument("--season", required=True, help="season id, e.g. 2023-2024")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--min-interval", type=float, default=0.0,
+                        help="minimum seconds between request starts (API rate limit)")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"response cache (default: {HTTP_CACHE_DIR_NAME} next to the CSV)")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.cache_dir or Path(args.data).resolve().parent / HTTP_CACHE_DIR_NAME
+    api_key = os.environ.get(API_KEY_ENV_VAR)
+    session = make_session(pool_size=args.workers, api_key=api_key)
+    fetcher = ConditionalFetcher(session, ResponseCache(cache_dir), min_interval=args.min_interval)
+    source_type = SOURCES[args.source]
+    sources = [source_type(league, args.season, base_url=args.base_url) for league in args.league]
+
+    start = time.perf_counter()
+    try:
+        report, fetched, changed_pages = refresh(args.data, sources, fetcher, args.workers)
+    except Exception as e:
+        print(f"Refresh failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+    print(
+        f"{fetched} pages ({changed_pages} changed) in {time.perf_counter() - start:.2f} s: "
+        f"{report.added} added, {report.updated} updated, {report.unchanged} unchanged"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""A generated team held as a slot -> player id array.
+
+Player ids are the engine table's row ids, which every team frame carries
+as its index. ``slot_of`` maps ids back to slots, so finding and swapping a
+player never scans names (duplicate names are fine) and a swap rewrites one
+row of the team frame in place: its cost does not depend on the dataset.
+"""
+import numpy as np
+
+
+class Lineup:
+    def __init__(self, team):
+        self.frame = team
+        self.ids = team.index.to_numpy(dtype=np.int64, copy=True)
+        self.slot_of = {player_id: slot for slot, player_id in enumerate(self.ids.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def player(self, slot):
+        return self.frame.iloc[slot]
+
+    def swap(self, slot, row, score):
+        """Put the player in ``row`` (a one-row frame from ``table.rows``) in ``slot``.
+
+        The slot keeps its ``pos_group``; ``score`` is the new player's
+        performance score. Columns the row does not have (such as a
+        selection rate) are cleared. Raises ValueError if the player is
+        already in the team.
+        """
+        player_id = int(row.index[0])
+        if player_id in self.slot_of:
+            raise ValueError(f"{row['Player'].iat[0]} is already in the team.")
+
+        frame = self.frame
+        for position, column in enumerate(frame.columns):
+            if column == 'pos_group':
+                continue
+            if column == 'performance_score':
+                frame.iat[slot, position] = score
+            elif column in row.columns:
+                frame.iat[slot, position] = row[column].iat[0]
+            else:
+                frame.iat[slot, position] = np.nan
+
+        del self.slot_of[int(self.ids[slot])]
+        self.ids[slot] = player_id
+        self.slot_of[player_id] = slot
+        frame.index = self.ids.copy()
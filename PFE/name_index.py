@@ -0,0 +1,98 @@
+"""Type-ahead player name search.
+
+Names are normalised (case-folded, diacritics stripped, so "alvarez" finds
+"Julián Álvarez") and indexed two ways:
+
+* sorted arrays of whole names and of every word-suffix ("julian alvarez",
+  "alvarez"), where a prefix query is a binary search for the first match
+  followed by reading matches in order until ``limit`` is reached;
+* trigram postings, for queries that match inside a word ("varez").
+
+Prefix matches on the whole name rank first, then matches at a later word,
+then infix matches; ties are alphabetical. No query scans every name.
+"""
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+DEFAULT_LIMIT = 10
+NGRAM = 3
+
+# Letters that do not decompose into a base letter plus accents
+FOLD = str.maketrans({
+    'ø': 'o', 'đ': 'd', 'ł': 'l', 'ı': 'i', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'þ': 'th', 'ð': 'd',
+})
+
+
+def normalize(name):
+    """'Martin Ødegaard' -> 'martin odegaard'"""
+    decomposed = unicodedata.normalize('NFKD', str(name).casefold().translate(FOLD))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.replace('-', ' ').split())
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class NameIndex:
+    def __init__(self, names):
+        self.normalized = [normalize(name) for name in names]
+
+        # Whole names, and every suffix starting at a later word
+        full = sorted((norm, player_id) for player_id, norm in enumerate(self.normalized))
+        words = []
+        for player_id, norm in enumerate(self.normalized):
+            starts = [i + 1 for i, char in enumerate(norm) if char == ' ']
+            words.extend((norm[start:], player_id) for start in starts)
+        words.sort()
+        self._full_keys = [key for key, _ in full]
+        self._full_ids = [player_id for _, player_id in full]
+        self._word_keys = [key for key, _ in words]
+        self._word_ids = [player_id for _, player_id in words]
+
+        postings = {}
+        for player_id, norm in enumerate(self.normalized):
+            for gram in ngrams(norm):
+                postings.setdefault(gram, []).append(player_id)
+        self._postings = {gram: np.array(ids) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.normalized)
+
+    @staticmethod
+    def _prefix(keys, ids, query, limit, found):
+        position = bisect_left(keys, query)
+        while position < len(keys) and len(found) < limit and keys[position].startswith(query):
+            found.setdefault(ids[position], None)
+            position += 1
+
+    def _infix(self, query, limit, found):
+        grams = sorted(ngrams(query), key=lambda gram: len(self._postings.get(gram, ())))
+        if not grams or grams[0] not in self._postings:
+            return
+        candidates = self._postings[grams[0]]
+        for gram in grams[1:]:
+            candidates = np.intersect1d(candidates, self._postings[gram], assume_unique=True)
+            if not len(candidates):
+                return
+        matches = sorted(
+            (self.normalized[player_id], player_id)
+            for player_id in candidates.tolist()
+            if player_id not in found and query in self.normalized[player_id]
+        )
+        for _, player_id in matches[:limit - len(found)]:
+            found[player_id] = None
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Ids of up to ``limit`` players matching ``query``, best first."""
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+        found = {}
+        self._prefix(self._full_keys, self._full_ids, query, limit, found)
+        self._prefix(self._word_keys, self._word_ids, query, limit, found)
+        if len(found) < limit and len(query) >= NGRAM:
+            self._infix(query, limit, found)
+        return list(found)
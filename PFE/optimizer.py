@@ -0,0 +1,119 @@
+"""Exact lineup selection.
+
+Picks the XI with the highest total score for a formation by solving a small
+0/1 integer program: one variable per (player, position) pair the player is
+eligible for, exactly ``count`` players per position, each player used at
+most once and optionally at most ``max_per_club`` players from one club.
+Candidates are given as row positions into the player frame plus a score per
+row, so callers never need to copy the frame.
+
+The candidate set is pruned before solving so the program stays tiny however
+large the dataset is (see ``prune_candidates``).
+"""
+import numpy as np
+
+from roles import ROLE_BITS, role_masks
+
+
+def prune_candidates(df, rows, scores, positions_needed, max_per_club=None, masks=None):
+    """Return (row position, position) pairs that can appear in an optimal XI.
+
+    Pruning is exact. Within a club, no more than ``max_per_club`` players
+    can be picked in total, so for each (position, club) only the best
+    ``max_per_club`` candidates are kept: if a worse one were picked, one of
+    the better ones would be unused and could take their place. Across
+    clubs, keeping the best ``total`` (or ``2 * total`` with a club cap)
+    candidates per position leaves enough unused players from clubs with
+    room to make the same swap argument.
+
+    ``masks`` are the role bitmasks of ``rows`` (see ``roles``); they are
+    parsed from ``Pos`` when not given.
+    """
+    total = sum(positions_needed.values())
+    per_club = total if max_per_club is None else min(max_per_club, total)
+    keep_per_position = total if max_per_club is None else 2 * total
+
+    if masks is None:
+        masks = role_masks(df['Pos'].iloc[rows].to_numpy())
+    clubs = df['Team'].iloc[rows].to_numpy()
+    pairs = []
+    for pos, count in positions_needed.items():
+        if count == 0:
+            continue
+        candidates = np.flatnonzero(masks & ROLE_BITS[pos])
+        if len(candidates) < count:
+            raise ValueError(
+                f"Not enough {pos} players available with current filters. "
+                f"Please adjust filters or try a different formation."
+            )
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        # Best `per_club` per club, then the best `keep_per_position` overall
+        taken = {}
+        kept = []
+        for candidate in candidates:
+            club = clubs[candidate]
+            if taken.get(club, 0) < per_club:
+                taken[club] = taken.get(club, 0) + 1
+                kept.append(candidate)
+                if len(kept) == keep_per_position:
+                    break
+        pairs.extend((candidate, pos) for candidate in kept)
+    return pairs
+
+
+def select_optimal_xi(df, rows, scores, positions_needed, max_per_club=None, masks=None):
+    """Pick the highest-scoring XI among the candidate ``rows`` of ``df``.
+
+    ``scores`` is aligned with ``rows``. Returns ``(rows, positions, scores)``
+    arrays for the chosen players, ordered by position and then score, where
+    ``positions`` is the role each player was assigned to. Raises ValueError
+    if no lineup satisfies the constraints. ``masks`` as for
+    ``prune_candidates``.
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    rows = np.asarray(rows)
+    scores = np.asarray(scores, dtype=np.float64)
+    pairs = prune_candidates(df, rows, scores, positions_needed, max_per_club, masks)
+    pair_candidates = np.array([candidate for candidate, _ in pairs], dtype=np.int64)
+    pair_pos = np.array([pos for _, pos in pairs])
+    pair_scores = scores[pair_candidates]
+
+    n_pairs = len(pairs)
+    constraints = []
+
+    # Exactly `count` players per position
+    positions = [pos for pos, count in positions_needed.items() if count]
+    A = np.array([pair_pos == pos for pos in positions], dtype=np.float64)
+    counts = np.array([positions_needed[pos] for pos in positions], dtype=np.float64)
+    constraints.append(LinearConstraint(A, counts, counts))
+
+    # Each player fills at most one slot
+    unique_candidates, player_of_pair = np.unique(pair_candidates, return_inverse=True)
+    A = np.zeros((len(unique_candidates), n_pairs))
+    A[player_of_pair, np.arange(n_pairs)] = 1
+    constraints.append(LinearConstraint(A, 0, 1))
+
+    # Club cap
+    if max_per_club is not None:
+        unique_clubs, club_of_pair = np.unique(df['Team'].iloc[rows[pair_candidates]].to_numpy(), return_inverse=True)
+        A = np.zeros((len(unique_clubs), n_pairs))
+        A[club_of_pair, np.arange(n_pairs)] = 1
+        constraints.append(LinearConstraint(A, 0, max_per_club))
+
+    result = milp(
+        c=-pair_scores,
+        constraints=constraints,
+        integrality=np.ones(n_pairs),
+        bounds=Bounds(0, 1),
+    )
+    if result.status != 0 or result.x is None:
+        raise ValueError(
+            "No lineup satisfies the current constraints. "
+            "Please relax the club limit or adjust filters."
+        )
+
+    chosen = np.flatnonzero(result.x > 0.5)
+    order = sorted(chosen, key=lambda i: (positions.index(pair_pos[i]), -pair_scores[i]))
+    return rows[pair_candidates[order]], pair_pos[order], pair_scores[order]
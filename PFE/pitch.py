@@ -0,0 +1,319 @@
+"""Formation pitch rendering.
+
+The pitch (field, centre circle, halfway line) is drawn once. Each of the
+eleven slots owns a player circle and two labels that are moved and relabelled
+in place, plus one shared star for the top performer. On a canvas that
+supports blitting, those artists are animated: the static background is
+cached as a bitmap after every full draw. An update compares each slot with
+what it showed before and only restores and redraws the screen area of the
+slots that actually changed, so a single swap touches one or two circles.
+"""
+import numpy as np
+from matplotlib import patches
+from matplotlib.transforms import Bbox
+
+PITCH_COLOR = '#1a472a'
+PLAYER_COLOR = '#375a7f'
+BACKGROUND_COLOR = '#2b2b2b'
+PLAYER_RADIUS = 0.5
+MAX_SLOTS = 11
+
+# Hand-placed layouts; other formations are spaced evenly per line
+FORMATION_LAYOUTS = {
+    (4, 3, 3): {
+        'GK': [(5, 0.5)],
+        'DF': [(2, 1.5), (4, 1.5), (6, 1.5), (8, 1.5)],
+        'MF': [(3, 3.5), (5, 3.5), (7, 3.5)],
+        'FW': [(2, 5.5), (5, 5.5), (8, 5.5)]
+    },
+    (3, 5, 2): {
+        'GK': [(5, 0.5)],
+        'DF': [(3, 1.5), (5, 1.5), (7, 1.5)],
+        'MF': [(2, 3.5), (4, 3.5), (5, 3.5), (6, 3.5), (8, 3.5)],
+        'FW': [(4, 5.5), (6, 5.5)]
+    },
+    (4, 4, 2): {
+        'GK': [(5, 0.5)],
+        'DF': [(2, 1.5), (4, 1.5), (6, 1.5), (8, 1.5)],
+        'MF': [(2, 3.5), (4, 3.5), (6, 3.5), (8, 3.5)],
+        'FW': [(4, 5.5), (6, 5.5)]
+    },
+}
+LINE_HEIGHTS = {'GK': 0.5, 'DF': 1.5, 'MF': 3.5, 'FW': 5.5}
+
+
+def formation_layout(formation):
+    """Return {pos_group: [(x, y), ...]} for a formation such as [4, 3, 3]."""
+    key = tuple(formation[:3])
+    if key in FORMATION_LAYOUTS:
+        return {pos: list(coords) for pos, coords in FORMATION_LAYOUTS[key].items()}
+    layout = {'GK': [(5, LINE_HEIGHTS['GK'])]}
+    for pos, count in zip(('DF', 'MF', 'FW'), key):
+        layout[pos] = [(10 * (i + 1) / (count + 1), LINE_HEIGHTS[pos]) for i in range(count)]
+    return layout
+
+
+def star_points(x, y):
+    points = []
+    for i in range(5):
+        # Outer point
+        angle = i * 2 * np.pi / 5 - np.pi / 2
+        points.append((x + 0.4 * np.cos(angle), y + 0.8 + 0.4 * np.sin(angle)))
+        # Inner point
+        angle = (i + 0.5) * 2 * np.pi / 5 - np.pi / 2
+        points.append((x + 0.2 * np.cos(angle), y + 0.8 + 0.2 * np.sin(angle)))
+    return points
+
+
+def short_name(name):
+    # Truncate long names
+    return name[:12] + "..." if len(name) > 15 else name
+
+
+class PlayerSlot:
+    """The artists for one position on the pitch."""
+
+    def __init__(self, ax, font_family, animated):
+        self.circle = patches.Circle(
+            (0, 0), PLAYER_RADIUS,
+            facecolor=PLAYER_COLOR, edgecolor='white', linewidth=1,
+            visible=False, animated=animated
+        )
+        ax.add_patch(self.circle)
+        self.name = ax.text(
+            0, 0, "", ha='center', va='center', fontsize=8, color='white',
+            fontfamily=font_family, visible=False, animated=animated
+        )
+        self.position = ax.text(
+            0, 0, "", ha='center', va='center', fontsize=7, color='white',
+            fontfamily=font_family, visible=False, animated=animated
+        )
+        self.state = None
+
+    def artists(self):
+        return (self.circle, self.name, self.position)
+
+    def show(self, x, y, name, pos_label, is_top):
+        self.state = (x, y, name, pos_label, is_top)
+        self.circle.center = (x, y)
+        self.circle.set_edgecolor('gold' if is_top else 'white')
+        self.circle.set_linewidth(2 if is_top else 1)
+        name = short_name(name)
+        self.name.set_position((x, y - 0.1))
+        self.name.set_text(name)
+        self.name.set_fontsize(8 if len(name) <= 10 else 7)
+        self.position.set_position((x, y + 0.1))
+        self.position.set_text(f"({pos_label})")
+        for artist in self.artists():
+            artist.set_visible(True)
+
+    def hide(self):
+        self.state = None
+        for artist in self.artists():
+            artist.set_visible(False)
+
+
+class FormationPitch:
+    """Draws a lineup on ``ax``, blitting when ``canvas`` supports it."""
+
+    def __init__(self, ax, canvas=None, font_family='sans-serif'):
+        self.ax = ax
+        self.canvas = canvas
+        self.use_blit = canvas is not None and getattr(canvas, 'supports_blit', False)
+        self.background = None
+        self._extents = {}
+        self.slot_xy = np.empty((0, 2))
+        self.slot_rows = []
+
+        self._draw_static()
+        self.slots = [PlayerSlot(ax, font_family, self.use_blit) for _ in range(MAX_SLOTS)]
+        self.star = patches.Polygon(
+            star_points(0, 0), closed=True, fill=True, color='gold',
+            visible=False, animated=self.use_blit
+        )
+        ax.add_patch(self.star)
+        self.title = ax.set_title(
+            "", color='white', pad=20, fontfamily=font_family, fontsize=12
+        )
+        self.title.set_animated(self.use_blit)
+
+        if self.use_blit:
+            self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _draw_static(self):
+        ax = self.ax
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 7)
+        ax.axis('off')
+        ax.set_facecolor(BACKGROUND_COLOR)
+
+        # Draw football field
+        ax.add_patch(patches.Rectangle((0, 0), 10, 7, facecolor=PITCH_COLOR, alpha=0.3))
+
+        # Draw center circle
+        ax.add_patch(patches.Circle((5, 3.5), 1, fill=False, color='white', alpha=0.5))
+
+        # Draw center line
+        ax.plot([0, 10], [3.5, 3.5], color='white', alpha=0.5, linestyle='--')
+
+    def animated_artists(self):
+        artists = [artist for slot in self.slots for artist in slot.artists()]
+        artists.append(self.star)
+        artists.append(self.title)
+        return artists
+
+    def _on_draw(self, event):
+        """Re-cache the background after any full redraw (resize, pan...)."""
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._extents.clear()
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.animated_artists():
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    def _extent(self, artists):
+        """Pixel bbox covering the visible ``artists``, or None.
+
+        Extents are cached per artist until ``_forget`` is called for it or
+        the figure is fully redrawn.
+        """
+        boxes = []
+        for artist in artists:
+            if not artist.get_visible():
+                continue
+            if artist not in self._extents:
+                # Pad for antialiasing and line width
+                extent = artist.get_window_extent(self.canvas.get_renderer())
+                self._extents[artist] = extent.padded(3)
+            boxes.append(self._extents[artist])
+        return Bbox.union(boxes) if boxes else None
+
+    def _forget(self, artists):
+        for artist in artists:
+            self._extents.pop(artist, None)
+
+    def refresh(self, dirty=None):
+        """Push artist changes to the screen.
+
+        ``dirty`` is a list of pixel bboxes that changed; None means the
+        whole figure. Only those areas are restored and re-blitted.
+        """
+        if not self.use_blit:
+            if self.canvas is not None:
+                self.canvas.draw_idle()
+            return
+        if self.background is None:
+            # First frame: a full draw caches the background via _on_draw
+            self.canvas.draw()
+            return
+        if dirty is None:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.canvas.figure.bbox)
+            return
+
+        dirty = [box for box in dirty if box is not None]
+        if not dirty:
+            return
+        area = Bbox.union(dirty)
+        # Grow the area until it fully contains every artist it touches, so
+        # nothing is drawn twice over its own antialiased edges
+        extents = [(artist, self._extent([artist])) for artist in self.animated_artists()
+                   if artist.get_visible()]
+        while True:
+            touched = [(artist, extent) for artist, extent in extents if extent.overlaps(area)]
+            grown = Bbox.union([area] + [extent for _, extent in touched])
+            if np.allclose(grown.extents, area.extents):
+                break
+            area = grown
+        area = Bbox.intersection(area, self.canvas.figure.bbox)
+        if area is None:
+            return
+
+        # restore_region takes buffer coordinates (origin at the top) and
+        # `xy` is the origin of the saved region, which is the whole figure
+        height = self.canvas.figure.bbox.height
+        x0, y0, x1, y1 = (int(np.floor(area.x0)), int(np.floor(height - area.y1)),
+                          int(np.ceil(area.x1)), int(np.ceil(height - area.y0)))
+        self.canvas.restore_region(self.background, bbox=(x0, y0, x1, y1), xy=(0, 0))
+        for artist, _ in touched:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(area)
+
+    def set_title(self, text):
+        if text == self.title.get_text():
+            return
+        dirty = self._extent([self.title]) if self.use_blit and self.background is not None else None
+        self.title.set_text(text)
+        self._forget([self.title])
+        if dirty is not None:
+            self.refresh([dirty, self._extent([self.title])])
+
+    def set_font_family(self, font_family):
+        """Switch every text artist to ``font_family`` and redraw the figure."""
+        for slot in self.slots:
+            slot.name.set_fontfamily(font_family)
+            slot.position.set_fontfamily(font_family)
+        self.title.set_fontfamily(font_family)
+        self._extents.clear()
+        if self.canvas is not None:
+            # A full draw also re-caches the blit background
+            self.canvas.draw_idle()
+
+    def slot_at(self, x, y):
+        """Index into ``slot_rows`` of the player circle containing (x, y), or None."""
+        if x is None or y is None or not len(self.slot_xy):
+            return None
+        distances = np.hypot(self.slot_xy[:, 0] - x, self.slot_xy[:, 1] - y)
+        nearest = int(distances.argmin())
+        return nearest if distances[nearest] <= PLAYER_RADIUS else None
+
+    def show_team(self, team, formation):
+        """Place the players of ``team`` (a frame with ``pos_group``) on the pitch.
+
+        Only slots whose player, position or highlight changed are redrawn.
+        """
+        layout = formation_layout(formation)
+        top_index = team['performance_score'].to_numpy().argmax() if len(team) else -1
+        blitting = self.use_blit and self.background is not None
+
+        placements = []
+        for i, (name, pos_label, pos_group) in enumerate(
+                zip(team['Player'], team['Pos'], team['pos_group'])):
+            coords = layout.get(pos_group)
+            if not coords or len(placements) == len(self.slots):
+                continue
+            x, y = coords.pop(0)
+            placements.append((i, x, y, name, pos_label, i == top_index))
+
+        dirty = []
+        for slot_number, slot in enumerate(self.slots):
+            state = placements[slot_number][1:] if slot_number < len(placements) else None
+            if state == slot.state:
+                continue
+            old = self._extent(slot.artists()) if blitting else None
+            if state is None:
+                slot.hide()
+            else:
+                slot.show(*state)
+            self._forget(slot.artists())
+            if blitting:
+                dirty.extend([old, self._extent(slot.artists())])
+
+        star_xy = [star_points(x, y) for _, x, y, _, _, is_top in placements if is_top]
+        old_star = self._extent([self.star]) if blitting else None
+        if star_xy:
+            if not self.star.get_visible() or not np.allclose(self.star.get_xy()[:-1], star_xy[0]):
+                self.star.set_xy(star_xy[0])
+                self.star.set_visible(True)
+                self._forget([self.star])
+                dirty.extend([old_star, self._extent([self.star]) if blitting else None])
+        elif self.star.get_visible():
+            self.star.set_visible(False)
+            dirty.append(old_star)
+
+        self.slot_xy = np.array([(x, y) for _, x, y, _, _, _ in placements], dtype=np.float64).reshape(-1, 2)
+        self.slot_rows = [i for i, _, _, _, _, _ in placements]
+        self.refresh(dirty if blitting else None)
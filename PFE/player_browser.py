@@ -0,0 +1,202 @@
+"""Virtualized browser over every player.
+
+``BrowserModel`` holds the current view of the table as one array of player
+ids (filtered, then sorted) and answers any window of it; it never touches
+Tk. Sort orders are computed once per column with a stable argsort and
+reused for both directions and for every filter, so changing the filter or
+the sort costs one pass over an id array rather than a frame sort.
+
+``VirtualTable`` shows a model in a ``ttk.Treeview`` that only ever holds
+the rows that fit on screen: scrolling rewrites the values of those items,
+so 100k players cost the same to display as 30.
+"""
+import numpy as np
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+from player_table import widen
+
+# (column, heading, width, format); 'performance_score' comes from the caller
+BROWSER_COLUMNS = [
+    ('Player', "Player", 180, "{}"),
+    ('Pos', "Position", 80, "{}"),
+    ('Team', "Club", 150, "{}"),
+    ('Nation', "Nation", 80, "{}"),
+    ('Age', "Age", 50, "{:.0f}"),
+    ('Min', "Minutes", 70, "{:.0f}"),
+    ('performance_score', "Score", 80, "{:.2f}"),
+    ('Gls', "Goals", 60, "{:.0f}"),
+    ('Ast', "Assists", 60, "{:.0f}"),
+    ('xG', "xG", 60, "{:.1f}"),
+    ('PrgP', "Prog. Passes", 90, "{:.0f}"),
+]
+DEFAULT_ROW_HEIGHT = 22
+
+
+class BrowserModel:
+    def __init__(self, table, extra=None):
+        self.table = table
+        # Numeric columns not in the table, such as scores under a tactic
+        self.extra = dict(extra or {})
+        self._orders = {}
+        self.rows = table.ids
+        self.sort_column = None
+        self.descending = False
+        self.ids = self.rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set_extra(self, column, values):
+        self.extra[column] = values
+        self._orders.pop(column, None)
+        self._update()
+
+    def _values(self, column):
+        if column in self.extra:
+            return self.extra[column]
+        if column in self.table.text:
+            # Categories are sorted, so codes sort alphabetically
+            return self.table.codes(column)
+        return self.table.stat(column)
+
+    def order(self, column):
+        """All player ids sorted ascending by ``column`` (computed once)."""
+        if column not in self._orders:
+            self._orders[column] = np.argsort(self._values(column), kind='stable')
+        return self._orders[column]
+
+    def set_rows(self, rows):
+        """Show only the player ids ``rows`` (for example a filter query)."""
+        self.rows = np.asarray(rows)
+        self._update()
+
+    def sort(self, column, descending=None):
+        """Sort by ``column``; repeating the same column flips the direction."""
+        if descending is None:
+            descending = not self.descending if column == self.sort_column else False
+        self.sort_column = column
+        self.descending = descending
+        self._update()
+
+    def _update(self):
+        if self.sort_column is None:
+            ids = self.rows
+        else:
+            order = self.order(self.sort_column)
+            keep = np.zeros(self.table.n_rows, dtype=bool)
+            keep[self.rows] = True
+            ids = order[keep[order]]
+            if self.descending:
+                ids = ids[::-1]
+        self.ids = ids
+
+    def window(self, start, count):
+        return self.ids[start:start + count]
+
+    def values(self, ids):
+        """Display tuples for ``ids``, one per player."""
+        columns = []
+        for column, _, _, fmt in BROWSER_COLUMNS:
+            if column in self.extra:
+                values = widen(self.extra[column][ids])
+            elif column in self.table.text:
+                values = self.table.categories(column)[self.table.codes(column)[ids]]
+            elif column in self.table.stat_index:
+                values = widen(self.table.stat(column)[ids])
+            else:
+                values = [""] * len(ids)
+                fmt = "{}"
+            columns.append([fmt.format(value) for value in values])
+        return list(zip(*columns))
+
+
+class VirtualTable(ttk.Frame):
+    """A Treeview showing a window of a BrowserModel, with its own scrollbar."""
+
+    def __init__(self, master, model, on_activate=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.on_activate = on_activate
+        self.top = 0
+        self.visible = 0
+        self.window_ids = np.array([], dtype=np.int64)
+
+        columns = [column for column, _, _, _ in BROWSER_COLUMNS]
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width, _ in BROWSER_COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort(c))
+            self.tree.column(column, width=width, stretch=column == 'Player')
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+
+        style_height = ttk.Style().lookup("Treeview", "rowheight")
+        self.row_height = int(style_height) if style_height else DEFAULT_ROW_HEIGHT
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_wheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.top - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.top + 3))
+        self.tree.bind('<Double-Button-1>', self.on_double_click)
+        for key, step in (('<Prior>', -1), ('<Next>', 1)):
+            self.tree.bind(key, lambda event, s=step: self.scroll_to(self.top + s * self.visible))
+
+    def on_resize(self, event):
+        # Rows that fit under the heading row
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def on_wheel(self, event):
+        self.scroll_to(self.top - int(np.sign(event.delta)) * 3)
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.model)))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.model) - self.visible))
+        if top != self.top:
+            self.top = top
+            self.refresh()
+        return "break"
+
+    def sort(self, column):
+        self.model.sort(column)
+        arrow = " ▼" if self.model.descending else " ▲"
+        for name, heading, _, _ in BROWSER_COLUMNS:
+            self.tree.heading(name, text=heading + (arrow if name == column else ""))
+        self.top = 0
+        self.refresh()
+
+    def refresh(self):
+        """Show the rows from ``top``, reusing the existing items."""
+        self.top = max(0, min(self.top, len(self.model) - self.visible))
+        ids = self.model.window(self.top, self.visible)
+        values = self.model.values(ids)
+
+        items = self.tree.get_children()
+        for item, row in zip(items, values):
+            self.tree.item(item, values=row)
+        for row in values[len(items):]:
+            self.tree.insert("", END, values=row)
+        if len(items) > len(values):
+            self.tree.delete(*items[len(values):])
+        self.window_ids = ids
+
+        total = len(self.model)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(ids)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_double_click(self, event):
+        item = self.tree.identify_row(event.y)
+        if item and self.on_activate is not None:
+            self.on_activate(int(self.window_ids[self.tree.index(item)]))
@@ -0,0 +1,126 @@
+"""Compact, typed storage for the player table.
+
+Text columns are dictionary-encoded (``pd.Categorical``: small integer
+codes plus one copy of each distinct string), and every numeric stat lives
+in a single C-contiguous float32 block with a column-name -> index map.
+Rows are addressed by integer player ids, which are positions in the table.
+
+``PlayerTable.frame`` is a DataFrame whose stat columns are views into the
+block, so code that still works with ``df[...]`` reads the same memory
+instead of a second copy. Only small selections (a lineup, a page of
+results) are ever materialised as separate frames, via ``rows(ids)``.
+"""
+import numpy as np
+import pandas as pd
+
+TEXT_COLUMNS = ['Player', 'Nation', 'Pos', 'Team', 'pos_group']
+STAT_DTYPE = np.float32
+CODE_DTYPE = np.int32
+
+
+def widen(values):
+    """float32 -> float64, rounded to float32's 7 significant digits.
+
+    Keeps the decimal that was stored (1.3 stays 1.3 rather than
+    1.2999999523...), so scores and exported numbers match the CSV.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.floor(np.log10(np.abs(values), out=np.zeros_like(values), where=values != 0))
+    scale = 10.0 ** (6 - magnitude)
+    return np.round(values * scale) / scale
+
+
+def compact_frame(df):
+    """Return ``df`` with text columns as categoricals and stats as float32.
+
+    Used before the prepared frame is cached, so the pickle and the loaded
+    frame are already compact.
+    """
+    compact = {}
+    for column in df.columns:
+        if column in TEXT_COLUMNS:
+            compact[column] = df[column].astype(str).astype('category')
+        elif column == 'cluster':
+            compact[column] = df[column].astype(CODE_DTYPE)
+        elif pd.api.types.is_numeric_dtype(df[column]):
+            compact[column] = df[column].astype(STAT_DTYPE)
+        else:
+            compact[column] = df[column]
+    return pd.DataFrame(compact, index=df.index)
+
+
+class PlayerTable:
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        self.n_rows = len(df)
+        self.ids = np.arange(self.n_rows)
+
+        self.stat_columns = [
+            column for column in df.columns
+            if column not in TEXT_COLUMNS and column != 'cluster'
+            and pd.api.types.is_numeric_dtype(df[column])
+        ]
+        self.stat_index = {column: i for i, column in enumerate(self.stat_columns)}
+        self.stats = np.ascontiguousarray(df[self.stat_columns].to_numpy(dtype=STAT_DTYPE))
+
+        self.text = {}
+        for column in TEXT_COLUMNS:
+            if column in df.columns:
+                values = df[column]
+                if not isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(str).astype('category')
+                self.text[column] = values.array
+        self.other = {
+            column: df[column].to_numpy()
+            for column in df.columns
+            if column not in self.stat_index and column not in self.text
+        }
+        self.columns = list(df.columns)
+
+        # Shares the stats block; the text columns share their codes
+        frame = pd.DataFrame(self.stats, columns=self.stat_columns, copy=False)
+        for column, values in self.text.items():
+            frame[column] = values
+        for column, values in self.other.items():
+            frame[column] = values
+        self.frame = frame
+
+    def stat(self, column):
+        """View of one stat column."""
+        return self.stats[:, self.stat_index[column]]
+
+    def stat_block(self, columns):
+        """The given stat columns as an (n, len(columns)) array."""
+        indexes = [self.stat_index[column] for column in columns]
+        if indexes == list(range(indexes[0], indexes[0] + len(indexes))):
+            return self.stats[:, indexes[0]:indexes[0] + len(indexes)]
+        return self.stats[:, indexes]
+
+    def codes(self, column):
+        return self.text[column].codes
+
+    def categories(self, column):
+        return self.text[column].categories
+
+    def code_of(self, column, value):
+        """Integer code of ``value`` in a text column, or -1 if absent."""
+        return int(self.text[column].categories.get_indexer([value])[0])
+
+    def ids_of(self, column, value):
+        """Player ids whose text ``column`` equals ``value``."""
+        code = self.code_of(column, value)
+        return np.flatnonzero(self.codes(column) == code) if code >= 0 else np.array([], dtype=np.int64)
+
+    def rows(self, ids):
+        """Materialise the players ``ids`` as a small standalone frame."""
+        return self.frame.iloc[np.asarray(ids)].copy()
+
+    def nbytes(self):
+        """Bytes held by the codes, categories and stat block (the session's table memory)."""
+        total = self.stats.nbytes
+        for values in self.text.values():
+            total += values.codes.nbytes
+            total += values.categories.memory_usage(deep=True)
+        for values in self.other.values():
+            total += values.nbytes
+        return total
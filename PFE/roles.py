@@ -0,0 +1,55 @@
+"""Role eligibility as bitmasks.
+
+``Pos`` lists every role a player can fill, such as ``"FW,MF"``. Each player
+gets a bitmask with one bit per role in ``ROLES``, and ``RoleIndex`` keeps a
+ready-made id array of every player eligible for each role, so a position
+pool is a dict lookup (or one AND over a filtered id array) instead of a
+string comparison over the table.
+
+``pos_group`` stays as the player's primary role, the first one listed, for
+the places that need exactly one role per player (tactic position weights).
+"""
+import numpy as np
+
+ROLES = ['GK', 'DF', 'MF', 'FW']
+ROLE_BITS = {role: 1 << bit for bit, role in enumerate(ROLES)}
+MASK_DTYPE = np.uint8
+UNKNOWN_ROLE = 'Unknown'
+
+
+def parse_roles(pos):
+    """Bitmask of the roles in a ``Pos`` value; 0 if none are known."""
+    mask = 0
+    for role in str(pos).split(','):
+        mask |= ROLE_BITS.get(role.strip(), 0)
+    return mask
+
+
+def primary_role(pos):
+    """The first known role in a ``Pos`` value, or ``UNKNOWN_ROLE``."""
+    for role in str(pos).split(','):
+        if role.strip() in ROLE_BITS:
+            return role.strip()
+    return UNKNOWN_ROLE
+
+
+def role_masks(pos_values):
+    """Bitmask per value, parsing each distinct ``Pos`` string once."""
+    distinct, inverse = np.unique(np.asarray(pos_values, dtype=str), return_inverse=True)
+    masks = np.array([parse_roles(pos) for pos in distinct], dtype=MASK_DTYPE)
+    return masks[inverse]
+
+
+class RoleIndex:
+    def __init__(self, table):
+        # Pos is dictionary-encoded: parse the categories, then map the codes
+        categories = table.categories('Pos')
+        category_masks = np.array([parse_roles(pos) for pos in categories], dtype=MASK_DTYPE)
+        self.masks = category_masks[table.codes('Pos')]
+        self.members = {
+            role: np.flatnonzero(self.masks & bit) for role, bit in ROLE_BITS.items()
+        }
+
+    def eligible(self, rows, role):
+        """Boolean array: which of ``rows`` can play ``role``."""
+        return (self.masks[rows] & ROLE_BITS[role]) != 0
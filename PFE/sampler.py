@@ -0,0 +1,106 @@
+"""Monte Carlo squad sampling.
+
+Draws many candidate XIs at once to show how robust a selection is. For
+each position, the top ``pool_size`` candidates by score form the pool and
+every sample picks ``count`` of them without replacement, with probability
+growing with score: ``exp((score - best) / (temperature * spread))`` where
+``spread`` is the pool's score standard deviation. ``temperature`` 0 always
+picks the best; large values approach a uniform draw from the pool.
+
+As in the other selection modes, multi-role players are eligible for every
+role they can fill (see ``roles``). Positions are drawn in order; a player
+already drawn for an earlier position of a sample is skipped, and such
+players do not count towards the next pool's ``pool_size``, so every
+sample can always fill every slot.
+
+Sampling without replacement is done for all samples in one pass with the
+Gumbel-top-k trick: add Gumbel noise to the log-weights and keep the
+``count`` largest keys per row.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from roles import ROLE_BITS
+
+DEFAULT_SAMPLES = 5000
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TEMPERATURE = 1.0
+HISTOGRAM_BINS = 20
+
+# lineups: (samples, players) player ids; positions: pos group per column
+SampleResult = namedtuple("SampleResult", ["lineups", "positions", "totals", "player_scores"])
+
+
+def sample_lineups(candidates, scores, masks, positions_needed, n_samples=DEFAULT_SAMPLES,
+                   pool_size=DEFAULT_POOL_SIZE, temperature=DEFAULT_TEMPERATURE, rng=None):
+    """Sample ``n_samples`` lineups.
+
+    ``candidates`` are player ids, with a score and a role bitmask each.
+    Raises ValueError when a position has fewer candidates than it needs.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    lineups = []
+    positions = []
+    totals = np.zeros(n_samples)
+    player_scores = {}
+    # Candidates in an earlier position's pool, who some samples have drawn
+    pooled = np.zeros(len(candidates), dtype=bool)
+
+    for pos, count in positions_needed.items():
+        if count == 0:
+            continue
+        in_pos = np.flatnonzero(masks & ROLE_BITS[pos])
+        if np.count_nonzero(~pooled[in_pos]) < count:
+            raise ValueError(
+                f"Not enough {pos} players available with current filters. "
+                f"Please adjust filters or try a different formation."
+            )
+        in_pos = in_pos[np.argsort(-scores[in_pos], kind='stable')]
+        # The best `pool_size` not pooled before, plus the pooled players
+        # ranked among them
+        fresh = np.cumsum(~pooled[in_pos])
+        pool = in_pos[:np.searchsorted(fresh, max(pool_size, count)) + 1]
+        pool_scores = scores[pool]
+
+        if temperature <= 0 or len(pool) == count:
+            # Best first: keys fall with rank
+            keys = np.tile(-np.arange(len(pool), dtype=np.float64), (n_samples, 1))
+        else:
+            spread = pool_scores.std() or 1.0
+            logits = (pool_scores - pool_scores.max()) / (temperature * spread)
+            keys = logits + rng.gumbel(size=(n_samples, len(pool)))
+        if lineups:
+            drawn = np.hstack(lineups)
+            for column in np.flatnonzero(pooled[pool]):
+                keys[(drawn == candidates[pool[column]]).any(axis=1), column] = -np.inf
+        picks = np.argpartition(-keys, count - 1, axis=1)[:, :count]
+        pooled[pool] = True
+
+        lineups.append(candidates[pool][picks])
+        positions.extend([pos] * count)
+        totals += pool_scores[picks].sum(axis=1)
+        player_scores.update(zip(candidates[pool].tolist(), pool_scores.tolist()))
+
+    return SampleResult(np.hstack(lineups), positions, totals, player_scores)
+
+
+def summarize(result, bins=HISTOGRAM_BINS):
+    """Score distribution, per-player selection rates and best/median sample indexes."""
+    totals = result.totals
+    percentiles = [5, 25, 50, 75, 95]
+    counts, edges = np.histogram(totals, bins=bins)
+    ids, picked = np.unique(result.lineups, return_counts=True)
+    median = np.percentile(totals, 50)
+    return {
+        'samples': len(totals),
+        'mean': float(totals.mean()),
+        'std': float(totals.std()),
+        'min': float(totals.min()),
+        'max': float(totals.max()),
+        'percentiles': {p: float(v) for p, v in zip(percentiles, np.percentile(totals, percentiles))},
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+        'selection_rate': dict(zip(ids.tolist(), (picked / len(totals)).tolist())),
+        'best_sample': int(totals.argmax()),
+        'median_sample': int(np.abs(totals - median).argmin()),
+    }
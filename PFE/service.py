@@ -0,0 +1,332 @@
+"""Local JSON HTTP service over the team engine.
+
+One ``TeamEngine`` is loaded at startup and shared, read-only, by every
+request thread, so a request costs a filter query and a selection rather
+than a dataset load. Per-route latency is recorded and served at
+``/metrics``.
+
+Routes:
+
+    GET  /health                        dataset version, size and the bytes
+                                        the player table and tactic scores
+                                        hold
+    GET  /tactics                       tactic definitions, formations, modes
+    POST /lineup                        JSON body of generation parameters
+                                        (see engine.DEFAULT_PARAMS), plus an
+                                        optional integer "seed"
+    POST /sample                        same body; Monte Carlo score
+                                        distribution, selection rates and
+                                        the best and median sampled XIs
+    POST /best_xi?by=Club               same body; the best XI of every club,
+                                        nation or age band ("Nation",
+                                        "Age band"), best group first
+    GET  /similar?player=NAME&n=5&tactic=balanced&same_cluster=0
+    GET  /search?q=alvarez&limit=10     type-ahead name search, ignoring case
+                                        and accents
+    GET  /metrics                       request counts, latency percentiles and
+                                        result cache hits and misses
+
+Run with ``python service.py [--data data.csv] [--host 127.0.0.1] [--port 8765]``.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from engine import (
+    DEFAULT_DATA_PATH,
+    FORMATIONS,
+    SELECTION_MODES,
+    TeamEngine,
+    make_params,
+)
+from player_table import widen
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024
+MAX_SIMILAR = 50
+MAX_SEARCH = 50
+
+# Columns returned for each player, when present in the dataset
+PLAYER_FIELDS = [
+    'group', 'Player', 'Pos', 'pos_group', 'Team', 'Nation', 'Age', 'Min',
+    'Gls', 'Ast', 'xG', 'PrgP', 'cluster', 'performance_score', 'similarity', 'selection_rate',
+]
+
+
+class RequestError(Exception):
+    """A client error, answered with ``status`` and the message."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyMetrics:
+    """Thread-safe request counts and latency samples per route.
+
+    Only the most recent ``window`` samples per route are kept for the
+    percentiles; counts cover the whole lifetime of the server.
+    """
+
+    def __init__(self, window=2048):
+        self.window = window
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    'count': 0, 'client_errors': 0, 'server_errors': 0,
+                    'samples': deque(maxlen=self.window),
+                }
+            entry['count'] += 1
+            if 400 <= status < 500:
+                entry['client_errors'] += 1
+            elif status >= 500:
+                entry['server_errors'] += 1
+            entry['samples'].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {
+                route: (entry['count'], entry['client_errors'], entry['server_errors'],
+                        np.array(entry['samples']))
+                for route, entry in self._routes.items()
+            }
+        uptime = time.time() - self.started
+        result = {'uptime_s': round(uptime, 1), 'routes': {}}
+        for route, (count, client_errors, server_errors, samples) in sorted(routes.items()):
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+            result['routes'][route] = {
+                'count': count,
+                'client_errors': client_errors,
+                'server_errors': server_errors,
+                'rate_per_s': round(count / uptime, 2) if uptime > 0 else None,
+                'mean_ms': round(samples.mean() * 1000, 3),
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'p99_ms': round(p99, 3),
+                'max_ms': round(samples.max() * 1000, 3),
+            }
+        return result
+
+
+def _json_default(value):
+    # numpy scalars and arrays from the frame
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+def player_records(frame):
+    frame = frame[[col for col in PLAYER_FIELDS if col in frame.columns]].copy()
+    for column in frame.columns:
+        if frame[column].dtype == np.float32:
+            frame[column] = widen(frame[column].to_numpy())
+    return frame.to_dict(orient='records')
+
+
+def _single(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+class TeamRequestHandler(BaseHTTPRequestHandler):
+    server_version = "TeamBuilder/1.0"
+    # Keep-alive, so polling dashboards do not reconnect per request
+    protocol_version = "HTTP/1.1"
+
+    routes = {
+        ('GET', '/health'): 'handle_health',
+        ('GET', '/tactics'): 'handle_tactics',
+        ('POST', '/lineup'): 'handle_lineup',
+        ('POST', '/sample'): 'handle_sample',
+        ('POST', '/best_xi'): 'handle_best_xi',
+        ('GET', '/similar'): 'handle_similar',
+        ('GET', '/search'): 'handle_search',
+        ('GET', '/metrics'): 'handle_metrics',
+    }
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        handler = self.routes.get((method, url.path))
+        try:
+            body = self.read_body()
+            if handler is None:
+                raise RequestError(f"No route for {method} {url.path}", status=404)
+            status, payload = 200, getattr(self, handler)(parse_qs(url.query), body)
+        except RequestError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ValueError as e:
+            # Engine validation and "not enough players" messages
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e}")
+            status, payload = 500, {'error': "Internal server error"}
+
+        self.send_json(status, payload)
+        route = url.path if handler is not None else 'unmatched'
+        self.server.metrics.record(route, status, time.perf_counter() - start)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise RequestError("Request body too large", status=413)
+        return self.rfile.read(length) if length else b""
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def handle_health(self, query, body):
+        engine = self.server.engine
+        return {
+            'status': 'ok',
+            'data_version': engine.data_version,
+            'players': len(engine.df),
+            'table_bytes': int(engine.table.nbytes()),
+            'tactic_bytes': int(engine.tactic_scores.nbytes()),
+        }
+
+    def handle_tactics(self, query, body):
+        return {'tactics': self.server.engine.tactics, 'formations': FORMATIONS, 'selection_modes': SELECTION_MODES}
+
+    def parse_params(self, body):
+        """Generation parameters and the optional seed from a JSON body."""
+        try:
+            overrides = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise RequestError(f"Invalid JSON body: {e}")
+        if not isinstance(overrides, dict):
+            raise RequestError("Body must be a JSON object")
+
+        seed = overrides.pop('seed', None)
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            raise RequestError("'seed' must be a non-negative integer")
+        return make_params(overrides, tactics=self.server.engine.tactics), seed
+
+    def handle_lineup(self, query, body):
+        params, seed = self.parse_params(body)
+        team = self.server.engine.generate_team(params, seed=seed)
+        return {
+            'params': params,
+            'players': player_records(team),
+            'total_score': team['performance_score'].sum(),
+        }
+
+    def handle_sample(self, query, body):
+        params, seed = self.parse_params(body)
+        distribution = self.server.engine.sample_teams(params, seed=seed)
+        summary = dict(distribution.summary)
+        # Keyed by player id, which dashboards cannot resolve; see frequencies
+        del summary['selection_rate']
+        return {
+            'params': params,
+            'summary': summary,
+            'best': player_records(distribution.best),
+            'median': player_records(distribution.median),
+            'frequencies': player_records(distribution.frequencies),
+        }
+
+    def handle_best_xi(self, query, body):
+        params, _ = self.parse_params(body)
+        grouped = self.server.engine.best_xi_by(params, _single(query, 'by', 'Club'))
+        return {
+            'params': params,
+            'groups': grouped.summary.to_dict(orient='records'),
+            'players': player_records(grouped.players),
+        }
+
+    def handle_similar(self, query, body):
+        name = _single(query, 'player')
+        if not name:
+            raise RequestError("Missing 'player' parameter")
+        tactic = _single(query, 'tactic', 'balanced')
+        if tactic not in self.server.engine.tactics:
+            raise RequestError(f"Unknown tactic '{tactic}'")
+        try:
+            n = int(_single(query, 'n', 5))
+        except ValueError:
+            raise RequestError("'n' must be an integer")
+        n = max(1, min(n, MAX_SIMILAR))
+        same_cluster = _single(query, 'same_cluster', '0').lower() in ('1', 'true', 'yes')
+
+        engine = self.server.engine
+        player = engine.find_player(name)
+        if player is None:
+            raise RequestError(f"Unknown player '{name}'", status=404)
+        similar = engine.compute_similar_players(player, tactic, n, same_cluster=same_cluster)
+        return {'player': player_records(engine.table.rows([player.name]))[0], 'similar': player_records(similar)}
+
+    def handle_search(self, query, body):
+        try:
+            limit = int(_single(query, 'limit', 10))
+        except ValueError:
+            raise RequestError("'limit' must be an integer")
+        limit = max(1, min(limit, MAX_SEARCH))
+        return {'players': player_records(self.server.engine.search_players(_single(query, 'q', ''), limit))}
+
+    def handle_metrics(self, query, body):
+        return dict(self.server.metrics.snapshot(), cache=self.server.engine.results.stats())
+
+
+class TeamService(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, engine, verbose=False):
+        super().__init__(address, TeamRequestHandler)
+        self.engine = engine
+        self.metrics = LatencyMetrics()
+        self.verbose = verbose
+
+
+def serve(engine, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+    """Build every index up front and bind a server; call ``serve_forever()`` on it."""
+    engine.warm()
+    return TeamService((host, port), engine, verbose=verbose)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Team builder JSON service")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH), help="path to data.csv")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = serve(TeamEngine(args.data), args.host, args.port, verbose=args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
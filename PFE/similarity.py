@@ -0,0 +1,157 @@
+"""Precomputed nearest-neighbour index for the Player Replacement tab.
+
+Players are compared by cosine similarity of their min-max normalised stats
+within their position group. Each group's normalised matrix and top-k
+neighbour lists are built once per dataset version, so a lookup is a slice
+of a precomputed array rather than a rescale and a full pairwise pass.
+"""
+import numpy as np
+
+SIMILARITY_STATS = ['Gls', 'Ast', 'xG', 'PrgP']
+DEFAULT_TOP_K = 25
+
+
+class GroupIndex:
+    """Normalised stats and neighbour lists for one position group."""
+
+    def __init__(self, rows, values, names, top_k):
+        # rows: positional indices into the full frame
+        self.rows = rows
+        self.names = names
+        self.mins = values.min(axis=0)
+        span = values.max(axis=0) - self.mins
+        # MinMaxScaler leaves constant columns at zero
+        self.span = np.where(span == 0, 1.0, span)
+        self.unit = self._unit_rows((values - self.mins) / self.span)
+
+        self.position_of = {}
+        for local, row in enumerate(rows):
+            self.position_of[int(row)] = local
+        self.by_name = {}
+        for local, name in enumerate(names):
+            self.by_name.setdefault(name, []).append(local)
+
+        self.neighbours, self.scores = self._build_neighbours(top_k)
+
+    @staticmethod
+    def _unit_rows(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def _build_neighbours(self, top_k):
+        """Find every player's top-k neighbours with a single KD-tree pass.
+
+        On unit vectors the euclidean distance is monotonic in cosine
+        similarity (``d^2 = 2 - 2 cos``), so a KD-tree query returns the same
+        ordering as a full cosine matrix without materialising it.
+        """
+        from scipy.spatial import cKDTree
+
+        n = len(self.rows)
+        k = min(top_k + 1, n)
+        neighbours = np.zeros((n, k), dtype=np.int64)
+        scores = np.zeros((n, k), dtype=np.float64)
+
+        nonzero = np.flatnonzero(self.unit.any(axis=1))
+        zero = np.flatnonzero(~self.unit.any(axis=1))
+        if len(nonzero):
+            tree = cKDTree(self.unit[nonzero])
+            kk = min(k, len(nonzero))
+            dist, idx = tree.query(self.unit[nonzero], k=kk)
+            dist = dist.reshape(len(nonzero), kk)
+            idx = idx.reshape(len(nonzero), kk)
+            neighbours[nonzero, :kk] = nonzero[idx]
+            scores[nonzero, :kk] = 1.0 - dist ** 2 / 2.0
+            if kk < k:
+                # Pad with all-zero players, whose similarity is 0
+                neighbours[np.ix_(nonzero, np.arange(kk, k))] = zero[:k - kk]
+        if len(zero):
+            # An all-zero player is equally (un)similar to everyone
+            neighbours[zero] = np.arange(k)
+        return neighbours, scores
+
+    def similarities_to(self, stats):
+        """Cosine similarity of an arbitrary stat vector to the whole group."""
+        vector = (np.asarray(stats, dtype=np.float64) - self.mins) / self.span
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return np.zeros(len(self.rows))
+        return self.unit @ (vector / norm)
+
+
+class SimilarityIndex:
+    """Per-``pos_group`` similarity lookups for one dataset version.
+
+    Groups are built lazily on first use and kept until the index is
+    replaced, which callers do when ``version`` changes. ``members`` maps a
+    role to the frame rows eligible for it (``RoleIndex.members``), so
+    multi-role players are compared with every role they can play; without
+    it a group is the rows with that ``pos_group``.
+    """
+
+    def __init__(self, df, version, stats=None, top_k=DEFAULT_TOP_K, members=None):
+        self.df = df
+        self.version = version
+        self.members = members
+        self.stats = list(stats or SIMILARITY_STATS)
+        self.top_k = top_k
+        self._groups = {}
+
+    def group(self, pos_group):
+        if pos_group not in self._groups:
+            if self.members is not None and pos_group in self.members:
+                rows = self.members[pos_group]
+            else:
+                rows = np.flatnonzero((self.df['pos_group'] == pos_group).to_numpy())
+            values = self.df[self.stats].iloc[rows].to_numpy(dtype=np.float64)
+            names = self.df['Player'].iloc[rows].to_numpy()
+            self._groups[pos_group] = GroupIndex(rows, values, names, self.top_k)
+        return self._groups[pos_group]
+
+    def _locate(self, group, player):
+        """Find the player's slot in the group, preferring its frame row."""
+        row = self.df.index.get_indexer([player.name])[0]
+        local = group.position_of.get(int(row))
+        if local is not None and group.names[local] == player['Player']:
+            return local
+        candidates = group.by_name.get(player['Player'])
+        return candidates[0] if candidates else None
+
+    @staticmethod
+    def _keep(group, candidates, player, allowed):
+        keep = group.names[candidates] != player['Player']
+        if allowed is not None:
+            keep &= allowed[group.rows[candidates]]
+        return keep
+
+    def query(self, player, n=5, allowed=None):
+        """Return (frame positions, similarities) of the ``n`` most similar players.
+
+        Players sharing the query player's name are excluded, as before.
+        ``allowed`` is an optional boolean mask over frame rows (for example
+        the player's cluster) that candidates must pass.
+        """
+        group = self.group(player['pos_group'])
+        if len(group.rows) == 0:
+            return np.array([], dtype=np.int64), np.array([])
+
+        local = self._locate(group, player)
+        excluded = len(group.by_name.get(player['Player'], ()))
+        candidates = None
+        if local is not None and n + excluded <= group.neighbours.shape[1]:
+            candidates = group.neighbours[local]
+            similarities = group.scores[local]
+            keep = self._keep(group, candidates, player, allowed)
+            if allowed is not None and keep.sum() < n:
+                candidates = None
+        if candidates is None:
+            # Unknown player, more results than were precomputed, or a mask
+            # that rules out too many of them
+            similarities = group.similarities_to(player[self.stats].to_numpy(dtype=np.float64))
+            candidates = np.argsort(-similarities, kind="stable")
+            similarities = similarities[candidates]
+            keep = self._keep(group, candidates, player, allowed)
+
+        candidates = candidates[keep][:n]
+        similarities = similarities[keep][:n]
+        return group.rows[candidates], similarities
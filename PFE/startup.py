@@ -0,0 +1,81 @@
+"""Startup timing for the team builder.
+
+``STARTUP`` records named phases from process start until the first window
+is idle; ``report()`` compares them against ``COLD_START_BUDGET_S`` and can
+append a ``-X importtime`` breakdown of the module-level imports.
+"""
+import subprocess
+import sys
+import time
+
+# Budget from process start until the main window is idle, on a warm dataset
+# cache. Heavy modules (sklearn, scipy, matplotlib, requests) must stay off
+# this path and be imported where their feature is first used.
+COLD_START_BUDGET_S = 1.5
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+        self._last = self.start
+
+    def mark(self, name):
+        """Close the current phase under ``name``."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def report(self, import_breakdown_for=None, top=15):
+        lines = ["Startup time report", "-" * 40]
+        for name, seconds in self.phases:
+            lines.append(f"{name:<28}{seconds * 1000:>9.1f} ms")
+        lines.append("-" * 40)
+        total = self.total()
+        status = "within" if total <= COLD_START_BUDGET_S else "OVER"
+        lines.append(f"{'total':<28}{total * 1000:>9.1f} ms")
+        lines.append(f"budget {COLD_START_BUDGET_S * 1000:.0f} ms: {status} budget")
+
+        if import_breakdown_for:
+            lines.append("")
+            lines.append(f"Top-level imports of '{import_breakdown_for}' (cumulative)")
+            lines.append("-" * 40)
+            for module, micros in import_breakdown(import_breakdown_for, top):
+                lines.append(f"{module:<28}{micros / 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+
+def import_breakdown(module, top=15):
+    """Return [(module, cumulative us)] for the direct imports of ``module``.
+
+    Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+    so modules already loaded in this process do not hide their cost.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=sys.path[0] or None,
+    )
+    entries = []
+    pending = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Children are listed before their parent, indented two spaces a level
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if level == 0:
+            if name.strip() == module:
+                entries = pending
+            pending = []
+        elif level == 1:
+            pending.append((name.strip(), int(cumulative)))
+    entries.sort(key=lambda entry: entry[1], reverse=True)
+    return entries[:top]
+
+
+STARTUP = StartupTimer()
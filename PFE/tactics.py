@@ -0,0 +1,217 @@
+"""Declarative tactics compiled into weight matrices.
+
+A tactic is a dict:
+
+    {
+        'description': 'Shown in tooltips and /tactics',      # optional
+        'weights': {'Gls': 0.25, 'xAG': 0.25, ...},            # every position group
+        'positions': {'DF': {'PrgP': 0.5, 'PrgC': 0.5}},       # optional, replaces
+                                                              # 'weights' for a group
+        'per90': ['PrgP'] or True,                             # optional; score these
+                                                              # (or all) columns per 90
+    }
+
+Weights may name any numeric column of the dataset. ``compile_tactics``
+turns a set of tactics into one (groups, features, tactics) weight tensor,
+where features are the referenced columns plus their per-90 variants, so
+scoring every player under every tactic is one matrix multiply per position
+group. ``TacticScores`` caches the resulting (players, tactics) matrix for
+one dataset version.
+
+``TacticTuner`` scores one tactic with weights that change interactively:
+changing k weights adds the k affected feature columns times the weight
+deltas to the current scores, instead of rescoring from scratch.
+
+Extra tactics can be kept in a JSON file of the same shape (see
+``load_tactics``).
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from player_table import widen
+
+MINUTES_90_COLUMN = '90s'
+
+TACTICS = {
+    'possession': {
+        'description': "Focus on ball control and passing",
+        'weights': {'Gls': 0.2, 'Ast': 0.4, 'xG': 0.2, 'PrgP': 0.2},
+    },
+    'counterattack': {
+        'description': "Quick transitions and direct play",
+        'weights': {'Gls': 0.4, 'Ast': 0.2, 'xG': 0.3, 'PrgP': 0.1},
+    },
+    'balanced': {
+        'description': "Equal emphasis on all aspects",
+        'weights': {'Gls': 0.25, 'Ast': 0.25, 'xG': 0.25, 'PrgP': 0.25},
+    },
+}
+
+# weights: (groups, features, tactics); group_index maps pos_group -> first axis
+CompiledTactics = namedtuple("CompiledTactics", ["names", "features", "group_index", "weights"])
+
+
+def per90_name(column):
+    return f"{column}/90"
+
+
+def _per90_columns(definition):
+    per90 = definition.get('per90', False)
+    if per90 is True:
+        columns = set(definition.get('weights', {}))
+        for weights in definition.get('positions', {}).values():
+            columns.update(weights)
+        return columns
+    return set(per90 or ())
+
+
+def validate_tactic(name, definition, columns):
+    """Raise ValueError if ``definition`` is malformed or names unknown columns."""
+    if not isinstance(definition, dict) or 'weights' not in definition:
+        raise ValueError(f"Tactic '{name}' needs a 'weights' mapping")
+    unknown_keys = set(definition) - {'description', 'weights', 'positions', 'per90'}
+    if unknown_keys:
+        raise ValueError(f"Tactic '{name}' has unknown keys: {', '.join(sorted(unknown_keys))}")
+
+    weight_sets = [definition['weights'], *definition.get('positions', {}).values()]
+    for weights in weight_sets:
+        for column, weight in weights.items():
+            if column not in columns:
+                raise ValueError(f"Tactic '{name}' weights unknown column '{column}'")
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool):
+                raise ValueError(f"Tactic '{name}' has a non-numeric weight for '{column}'")
+    if _per90_columns(definition) and MINUTES_90_COLUMN not in columns:
+        raise ValueError(f"Tactic '{name}' uses per-90 stats but there is no '{MINUTES_90_COLUMN}' column")
+
+
+def load_tactics(path, base=None):
+    """Return ``base`` (default ``TACTICS``) updated with the tactics in a JSON file."""
+    with open(path, encoding='utf-8') as fh:
+        extra = json.load(fh)
+    if not isinstance(extra, dict):
+        raise ValueError(f"{path} must contain an object of tactics")
+    tactics = dict(TACTICS if base is None else base)
+    tactics.update(extra)
+    return tactics
+
+
+def compile_tactics(tactics, columns, groups):
+    """Compile ``tactics`` for a dataset with ``columns`` and position ``groups``."""
+    for name, definition in tactics.items():
+        validate_tactic(name, definition, columns)
+
+    features = []
+    for definition in tactics.values():
+        per90 = _per90_columns(definition)
+        for weights in [definition['weights'], *definition.get('positions', {}).values()]:
+            for column in weights:
+                feature = per90_name(column) if column in per90 else column
+                if feature not in features:
+                    features.append(feature)
+    feature_index = {feature: i for i, feature in enumerate(features)}
+
+    groups = list(groups)
+    group_index = {group: i for i, group in enumerate(groups)}
+    weights = np.zeros((len(groups), len(features), len(tactics)))
+    for t, definition in enumerate(tactics.values()):
+        per90 = _per90_columns(definition)
+        for group, g in group_index.items():
+            group_weights = definition.get('positions', {}).get(group, definition['weights'])
+            for column, weight in group_weights.items():
+                feature = per90_name(column) if column in per90 else column
+                weights[g, feature_index[feature], t] = weight
+    return CompiledTactics(list(tactics), features, group_index, weights)
+
+
+def feature_matrix(table, features):
+    """(players, features) float32 matrix; per-90 features divide by ``90s``.
+
+    Stored like the stat block (a view of it when no per-90 feature is
+    needed); ``widen`` the rows being scored.
+    """
+    raw = [feature[:-len("/90")] if feature.endswith("/90") else feature for feature in features]
+    values = table.stat_block(raw)
+    per90 = [i for i, feature in enumerate(features) if feature.endswith("/90")]
+    if per90:
+        values = values.copy()
+        nineties = widen(table.stat(MINUTES_90_COLUMN))
+        values[:, per90] = np.divide(
+            widen(values[:, per90]), nineties[:, None],
+            out=np.zeros((len(values), len(per90))), where=nineties[:, None] > 0,
+        )
+    return values
+
+
+class TacticScores:
+    """Performance scores of every player under every tactic, for one dataset version."""
+
+    def __init__(self, table, tactics, version):
+        self.version = version
+        self.tactics = tactics
+        self.compiled = compile_tactics(tactics, table.stat_columns, table.categories('pos_group'))
+        self.index = {name: t for t, name in enumerate(self.compiled.names)}
+
+        # Kept (as float32) for TacticTuner's incremental updates; only the
+        # scores are float64
+        self.features = feature_matrix(table, self.compiled.features)
+        self._own_features = not np.shares_memory(self.features, table.stats)
+        self.codes = table.codes('pos_group')
+        self.matrix = np.zeros((table.n_rows, len(self.compiled.names)))
+        for group, g in self.compiled.group_index.items():
+            rows = np.flatnonzero(self.codes == g)
+            if len(rows):
+                self.matrix[rows] = widen(self.features[rows]) @ self.compiled.weights[g]
+
+    def scores(self, rows, tactic):
+        return self.matrix[rows, self.index[tactic]]
+
+    def nbytes(self):
+        """Bytes held beyond the stat block: the score matrix and any per-90 features."""
+        return self.matrix.nbytes + (self.features.nbytes if self._own_features else 0)
+
+
+class TacticTuner:
+    """Scores of every player under one tactic whose ``weights`` can be changed.
+
+    Only the tactic's ``weights`` are tunable; position groups with their own
+    ``positions`` weights keep them. ``scores`` is updated in place.
+    """
+
+    def __init__(self, tactic_scores, tactic):
+        definition = tactic_scores.tactics[tactic]
+        self.tactic = tactic
+        self.initial = dict(definition['weights'])
+        self.weights = dict(self.initial)
+        self.scores = tactic_scores.scores(slice(None), tactic).copy()
+
+        per90 = _per90_columns(definition)
+        features = tactic_scores.compiled.features
+        self.columns = {column: k for k, column in enumerate(self.weights)}
+        indexes = [features.index(per90_name(column) if column in per90 else column) for column in self.weights]
+        # (players, weights) values of just this tactic's columns, zero for
+        # the rows of groups that override them
+        overridden = [
+            g for group, g in tactic_scores.compiled.group_index.items()
+            if group in definition.get('positions', {})
+        ]
+        self.features = widen(tactic_scores.features[:, indexes])
+        self.features[np.isin(tactic_scores.codes, overridden)] = 0
+
+    @property
+    def tuned(self):
+        return self.weights != self.initial
+
+    def set_weights(self, weights):
+        """Apply new values for some weights; return whether any changed."""
+        changed = [column for column, value in weights.items() if value != self.weights[column]]
+        if not changed:
+            return False
+        deltas = np.array([weights[column] - self.weights[column] for column in changed])
+        self.scores += self.features[:, [self.columns[column] for column in changed]] @ deltas
+        self.weights.update({column: weights[column] for column in changed})
+        return True
+
+    def reset(self):
+        return self.set_weights(self.initial)
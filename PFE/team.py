@@ -1,10 +1,8 @@
+# Imported first so the startup timer also covers the imports below
+from startup import STARTUP
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
 import tkinter as tk
 from tkinter import ttk, font
 import ttkbootstrap as ttk
@@ -12,15 +10,33 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.tooltip import ToolTip
 from ttkbootstrap.scrolled import ScrolledFrame
 from ttkbootstrap.dialogs import Messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.figure import Figure
-import matplotlib.patches as patches
-from matplotlib.widgets import Cursor
-import threading
-import time
+import argparse
 import os
-import requests
-from pathlib import Path
+import queue
+
+# sklearn, scipy, matplotlib and requests are imported where they are first
+# needed; see startup.COLD_START_BUDGET_S
+from engine import DEFAULT_DATA_PATH, FORMATIONS, GROUP_BY, SELECTION_MODES, TeamEngine, make_params
+from font_bootstrap import (
+    FONT_FAMILY,
+    fetch_font_async,
+    locate_font,
+    register_matplotlib_font,
+    register_tk_font,
+    tk_font_family,
+)
+from lineup import Lineup
+from player_browser import BrowserModel, VirtualTable
+from roles import ROLE_BITS
+from worker import CoalescingWorker
+
+# Rows shown under the player search box
+SEARCH_RESULTS = 8
+# How often the Tk thread checks for a finished font download
+FONT_POLL_MS = 200
+# Upper end of the tactic weight sliders (raised for tactics weighting more)
+WEIGHT_MAX = 1.0
+
 
 class TeamBuilderGUI:
     def __init__(self, root):
@@ -32,9 +48,15 @@ class TeamBuilderGUI:
         self.style = ttk.Style("flatly")
         self.setup_fonts()
         self.configure_styles()
+        STARTUP.mark("fonts and styles")
         
         # Load and process data
         self.load_data()
+        STARTUP.mark("load data")
+        
+        # No team until the first generation
+        self.lineup = None
+        self.optimal_team = None
         
         # Create main container with padding
         self.main_container = ttk.Frame(root, padding="20")
@@ -53,30 +75,69 @@ class TeamBuilderGUI:
         # Create results frame
         self.create_results_frame()
         
+        # Persistent background worker for team generation
+        self.generation_worker = CoalescingWorker(self.root, name="team-generation")
+        
         # Configure grid weights for responsive layout
         self.content_frame.columnconfigure(1, weight=3)
         self.content_frame.rowconfigure(0, weight=1)
+        STARTUP.mark("build widgets")
         
     def setup_fonts(self):
-        # Download Poppins font if not present
-        font_dir = Path("fonts")
-        font_path = font_dir / "Poppins-Regular.ttf"
-        
-        if not font_path.exists():
-            print("Downloading Poppins font...")
-            font_url = "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf"
-            response = requests.get(font_url)
-            font_path.write_bytes(response.content)
+        # Register the bundled Poppins font with Tk; if it is missing, fetch it
+        # in the background and fall back to a system font until it arrives
+        self.font_path = locate_font()
+        if self.font_path is not None:
+            register_tk_font(self.font_path)
+        else:
+            # Tk is not thread-safe: the download thread only fills a queue,
+            # which the Tk thread polls
+            self.font_queue = queue.Queue()
+            self.font_thread = fetch_font_async(self.font_queue.put)
+            if self.font_thread is not None:
+                self.root.after(FONT_POLL_MS, self.poll_font_download)
+        family = tk_font_family(self.root)
         
         # Load custom font
-        self.custom_font = font.Font(family="Poppins", size=10)
-        self.title_font = font.Font(family="Poppins", size=24, weight="bold")
-        self.subtitle_font = font.Font(family="Poppins", size=12)
-        self.header_font = font.Font(family="Poppins", size=14, weight="bold")
+        self.custom_font = font.Font(family=family, size=10)
+        self.title_font = font.Font(family=family, size=24, weight="bold")
+        self.subtitle_font = font.Font(family=family, size=12)
+        self.header_font = font.Font(family=family, size=14, weight="bold")
         
-        # Configure matplotlib to use Poppins
-        plt.rcParams['font.family'] = 'Poppins'
-        plt.rcParams['font.size'] = 10
+        # matplotlib is configured when the figures are first created
+        self.plot_font_family = 'sans-serif'
+
+    def poll_font_download(self):
+        # Checked before the queue, so a download that lands in between is
+        # still picked up on the next poll
+        downloading = self.font_thread.is_alive()
+        try:
+            path = self.font_queue.get_nowait()
+        except queue.Empty:
+            if downloading:
+                self.root.after(FONT_POLL_MS, self.poll_font_download)
+            return
+        self.on_font_downloaded(path)
+    
+    def on_font_downloaded(self, path):
+        """Switch the named fonts and any drawn figures over to Poppins (Tk thread)."""
+        self.font_path = path
+        register_tk_font(path)
+        family = tk_font_family(self.root)
+        for named_font in (self.custom_font, self.title_font, self.subtitle_font, self.header_font):
+            named_font.configure(family=family)
+        
+        # Figures not created yet pick the font up in ensure_figures
+        if self.fig_formation is not None and register_matplotlib_font(path):
+            import matplotlib
+            
+            self.plot_font_family = FONT_FAMILY
+            matplotlib.rcParams['font.family'] = FONT_FAMILY
+            self.formation_pitch.set_font_family(FONT_FAMILY)
+            # The chart is rebuilt with the new font when next shown
+            if self.optimal_team is not None:
+                self.dirty['performance'] = None
+                self.render_visible()
 
     def configure_styles(self):
         # Configure ttkbootstrap styles
@@ -161,11 +222,31 @@ class TeamBuilderGUI:
         self.tactic_combo.pack(fill=X, pady=5)
         ToolTip(
             self.tactic_combo,
-            text="Choose your team's playing style:\n"
-                 "• Possession: Focus on ball control and passing\n"
-                 "• Counterattack: Quick transitions and direct play\n"
-                 "• Balanced: Equal emphasis on all aspects"
+            text="Choose your team's playing style:\n" + "\n".join(
+                f"• {name.capitalize()}: {tactic.get('description', '')}".rstrip(": ")
+                for name, tactic in self.tactics.items()
+            )
+        )
+        
+        # Live weights of the selected tactic; dragging re-selects the XI
+        weights_frame = ttk.LabelFrame(
+            self.controls_frame,
+            text="Tactic Weights",
+            padding="10"
         )
+        weights_frame.pack(fill=X, pady=10)
+        self.weight_sliders = ttk.Frame(weights_frame)
+        self.weight_sliders.pack(fill=X)
+        self.weight_sliders.columnconfigure(1, weight=1)
+        ttk.Button(
+            weights_frame,
+            text="Reset Weights",
+            command=self.reset_weights,
+            style="secondary.TButton"
+        ).pack(anchor=W, pady=(5, 0))
+        self.weight_seed = None
+        self.tactic_combo.bind('<<ComboboxSelected>>', lambda event: self.build_weight_sliders())
+        self.build_weight_sliders()
         
         # Formation selection
         formation_frame = ttk.Frame(self.controls_frame)
@@ -181,7 +262,7 @@ class TeamBuilderGUI:
         self.formation_combo = ttk.Combobox(
             formation_frame,
             textvariable=self.formation_var,
-            values=["4-3-3", "3-5-2", "4-4-2", "4-2-3-1", "3-4-3"],
+            values=FORMATIONS,
             state="readonly",
             width=20
         )
@@ -196,6 +277,33 @@ class TeamBuilderGUI:
                  "• 3-4-3: Offensive formation with wing-backs"
         )
         
+        # Selection mode
+        mode_frame = ttk.Frame(self.controls_frame)
+        mode_frame.pack(fill=X, pady=10)
+        
+        ttk.Label(
+            mode_frame,
+            text="Selection Mode:",
+            font=self.header_font
+        ).pack(anchor=W)
+        
+        self.selection_mode_var = tk.StringVar(value="Top-3 Sampling")
+        self.selection_mode_combo = ttk.Combobox(
+            mode_frame,
+            textvariable=self.selection_mode_var,
+            values=SELECTION_MODES,
+            state="readonly",
+            width=20
+        )
+        self.selection_mode_combo.pack(fill=X, pady=5)
+        ToolTip(
+            self.selection_mode_combo,
+            text="Choose how players are picked:\n"
+                 "• Top-3 Sampling: Random picks among the best per position\n"
+                 "• Optimal: The highest-scoring XI, honouring multi-position\n"
+                 "  players and the club limit"
+        )
+        
         # Player Filters
         filter_frame = ttk.LabelFrame(
             self.controls_frame,
@@ -277,6 +385,36 @@ class TeamBuilderGUI:
         self.club_combo.set("Any")
         self.club_combo.pack(side=LEFT, padx=5)
         
+        # Minimum minutes and club limit
+        limits_frame = ttk.Frame(filter_frame)
+        limits_frame.pack(fill=X, pady=5)
+        
+        ttk.Label(
+            limits_frame,
+            text="Min Minutes:",
+            font=self.custom_font
+        ).pack(side=LEFT, padx=5)
+        
+        self.min_minutes_var = tk.StringVar(value="0")
+        ttk.Entry(
+            limits_frame,
+            textvariable=self.min_minutes_var,
+            width=6
+        ).pack(side=LEFT, padx=2)
+        
+        ttk.Label(
+            limits_frame,
+            text="Max per Club:",
+            font=self.custom_font
+        ).pack(side=LEFT, padx=5)
+        
+        self.max_per_club_var = tk.StringVar(value="")
+        ttk.Entry(
+            limits_frame,
+            textvariable=self.max_per_club_var,
+            width=4
+        ).pack(side=LEFT, padx=2)
+        
         # Availability Filter
         availability_frame = ttk.Frame(filter_frame)
         availability_frame.pack(fill=X, pady=5)
@@ -308,6 +446,72 @@ class TeamBuilderGUI:
         )
         self.generate_btn.pack(pady=20)
         
+        # Best XI of every club, nation or age band side by side
+        group_frame = ttk.Frame(self.controls_frame)
+        group_frame.pack(fill=X, pady=(0, 10))
+        
+        ttk.Label(
+            group_frame,
+            text="Best XI by:",
+            font=self.custom_font
+        ).pack(side=LEFT, padx=5)
+        
+        self.group_by_var = tk.StringVar(value="Club")
+        ttk.Combobox(
+            group_frame,
+            textvariable=self.group_by_var,
+            values=list(GROUP_BY),
+            state="readonly",
+            width=10
+        ).pack(side=LEFT, padx=5)
+        
+        compare_btn = ttk.Button(
+            group_frame,
+            text="Compare Groups",
+            command=self.compare_groups,
+            style="secondary.TButton"
+        )
+        compare_btn.pack(side=LEFT, padx=5)
+        ToolTip(
+            compare_btn,
+            text="Best XI of every club, nation or age band under the current\n"
+                 "tactic, formation and other filters, best group first"
+        )
+        
+        # Player search, updated as you type
+        search_frame = ttk.LabelFrame(
+            self.controls_frame,
+            text="Find Player",
+            padding="10"
+        )
+        search_frame.pack(fill=X, pady=10)
+        
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(fill=X)
+        ToolTip(search_entry, text="Type part of a name; case and accents do not matter")
+        self.search_var.trace_add('write', self.on_search_changed)
+        
+        self.search_results = tk.Listbox(search_frame, height=5, exportselection=False)
+        self.search_results.pack(fill=X, pady=5)
+        self.search_results.bind('<Double-Button-1>', lambda event: self.show_searched_similar())
+        self.search_result_ids = []
+        
+        search_buttons = ttk.Frame(search_frame)
+        search_buttons.pack(fill=X)
+        ttk.Button(
+            search_buttons,
+            text="Pin to Lineup",
+            command=self.pin_searched_player,
+            style="secondary.TButton"
+        ).pack(side=LEFT, padx=5)
+        ttk.Button(
+            search_buttons,
+            text="Similar Players",
+            command=self.show_searched_similar,
+            style="secondary.TButton"
+        ).pack(side=LEFT, padx=5)
+        
         # Progress bar (initially hidden)
         self.progress = ttk.Progressbar(
             self.controls_frame,
@@ -327,41 +531,52 @@ class TeamBuilderGUI:
         self.notebook = ttk.Notebook(self.results_frame)
         self.notebook.pack(fill=BOTH, expand=YES)
         
+        # Views are rendered only while their tab is visible; changes to the
+        # team mark them stale (see mark_dirty)
+        self.tab_views = {}
+        self.dirty = {}
+        self.view_renderers = {
+            'formation': self.render_formation,
+            'performance': self.render_performance,
+            'details': self.render_team_list,
+            'replacement': self.render_replacement,
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
         # Formation tab
         formation_tab = ttk.Frame(self.notebook)
         self.notebook.add(formation_tab, text="Formation")
-        
-        # Create matplotlib figure for formation
-        self.fig_formation = Figure(figsize=(10, 7), facecolor='#2b2b2b')
-        self.ax_formation = self.fig_formation.add_subplot(111)
-        self.canvas_formation = FigureCanvasTkAgg(self.fig_formation, master=formation_tab)
-        self.canvas_formation.get_tk_widget().pack(fill=BOTH, expand=YES, pady=10)
-        
-        # Add toolbar for formation plot
-        toolbar_frame = ttk.Frame(formation_tab)
-        toolbar_frame.pack(fill=X)
-        toolbar = NavigationToolbar2Tk(self.canvas_formation, toolbar_frame)
-        toolbar.update()
+        self.tab_views[str(formation_tab)] = 'formation'
+        
+        # The matplotlib figures are created on first plot (see ensure_figures)
+        self.formation_tab = formation_tab
+        self.fig_formation = None
+        self.formation_hover_cid = None
+        self.formation_placeholder = ttk.Label(
+            formation_tab,
+            text="Generate a team to see the formation",
+            font=self.subtitle_font
+        )
+        self.formation_placeholder.pack(expand=YES)
         
         # Performance tab
         performance_tab = ttk.Frame(self.notebook)
         self.notebook.add(performance_tab, text="Performance Analysis")
+        self.tab_views[str(performance_tab)] = 'performance'
         
-        # Create matplotlib figure for performance
-        self.fig_performance = Figure(figsize=(10, 7), facecolor='#2b2b2b')
-        self.ax_performance = self.fig_performance.add_subplot(111)
-        self.canvas_performance = FigureCanvasTkAgg(self.fig_performance, master=performance_tab)
-        self.canvas_performance.get_tk_widget().pack(fill=BOTH, expand=YES, pady=10)
-        
-        # Add toolbar for performance plot
-        toolbar_frame_perf = ttk.Frame(performance_tab)
-        toolbar_frame_perf.pack(fill=X)
-        toolbar_perf = NavigationToolbar2Tk(self.canvas_performance, toolbar_frame_perf)
-        toolbar_perf.update()
+        self.performance_tab = performance_tab
+        self.fig_performance = None
+        self.performance_placeholder = ttk.Label(
+            performance_tab,
+            text="Generate a team to see performance scores",
+            font=self.subtitle_font
+        )
+        self.performance_placeholder.pack(expand=YES)
         
         # Team Details tab
         team_details_tab = ttk.Frame(self.notebook)
         self.notebook.add(team_details_tab, text="Team Details")
+        self.tab_views[str(team_details_tab)] = 'details'
         
         # Team list in a scrolled frame
         list_frame = ScrolledFrame(team_details_tab)
@@ -396,6 +611,7 @@ class TeamBuilderGUI:
         # Player Replacement tab
         replacement_tab = ttk.Frame(self.notebook)
         self.notebook.add(replacement_tab, text="Player Replacement")
+        self.tab_views[str(replacement_tab)] = 'replacement'
         
         # Create split view for replacement tab
         replacement_frame = ttk.Frame(replacement_tab)
@@ -461,15 +677,128 @@ class TeamBuilderGUI:
             state="disabled"
         )
         self.replace_button.pack(pady=10)
+        
+        # Group Comparison tab
+        self.comparison_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.comparison_tab, text="Group Comparison")
+        
+        self.comparison_tree = ttk.Treeview(
+            self.comparison_tab,
+            columns=("Position", "Score", "Players"),
+            show="tree headings",
+            height=10
+        )
+        self.comparison_tree.heading("#0", text="Group / Player")
+        self.comparison_tree.heading("Position", text="Position")
+        self.comparison_tree.heading("Score", text="Performance Score")
+        self.comparison_tree.heading("Players", text="Players")
+        
+        self.comparison_tree.column("#0", width=250)
+        self.comparison_tree.column("Position", width=100)
+        self.comparison_tree.column("Score", width=150)
+        self.comparison_tree.column("Players", width=100)
+        
+        self.comparison_tree.pack(fill=BOTH, expand=YES, padx=10, pady=10)
+        
+        # All Players tab: only the rows on screen exist as Treeview items
+        self.browser_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.browser_tab, text="All Players")
+        
+        browser_controls = ttk.Frame(self.browser_tab)
+        browser_controls.pack(fill=X, padx=10, pady=(10, 0))
+        self.browser_filters_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            browser_controls,
+            text="Apply Player Filters",
+            variable=self.browser_filters_var,
+            command=self.refresh_browser,
+            style="Switch.TCheckbutton"
+        ).pack(side=LEFT, padx=5)
+        ttk.Button(
+            browser_controls,
+            text="Refresh",
+            command=self.refresh_browser,
+            style="secondary.TButton"
+        ).pack(side=LEFT, padx=5)
+        self.browser_count = ttk.Label(browser_controls, font=self.custom_font)
+        self.browser_count.pack(side=RIGHT, padx=5)
+        
+        self.browser_model = BrowserModel(self.engine.table, extra={
+            'performance_score': self.player_scores(self.engine.table.ids)
+        })
+        self.browser = VirtualTable(
+            self.browser_tab,
+            self.browser_model,
+            on_activate=lambda player_id: self.show_similar_players(self.df.loc[player_id])
+        )
+        self.browser.pack(fill=BOTH, expand=YES, padx=10, pady=10)
+        ToolTip(self.browser.tree, text="Click a heading to sort; double-click a player for similar players")
+
+    def ensure_figures(self):
+        """Create the formation and performance figures on first use.
+        
+        matplotlib and its Tk backend are imported here rather than at module
+        level so the first window does not wait for them.
+        """
+        if self.fig_formation is not None:
+            return
+        
+        import matplotlib
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
+        from hover import HoverTip
+        from pitch import FormationPitch
+        
+        # Configure matplotlib to use Poppins
+        if self.font_path is not None and register_matplotlib_font(self.font_path):
+            self.plot_font_family = FONT_FAMILY
+        matplotlib.rcParams['font.family'] = self.plot_font_family
+        matplotlib.rcParams['font.size'] = 10
+        
+        self.formation_placeholder.destroy()
+        self.performance_placeholder.destroy()
+        
+        # Create matplotlib figure for formation
+        self.fig_formation = Figure(figsize=(10, 7), facecolor='#2b2b2b')
+        self.ax_formation = self.fig_formation.add_subplot(111)
+        self.canvas_formation = FigureCanvasTkAgg(self.fig_formation, master=self.formation_tab)
+        self.canvas_formation.get_tk_widget().pack(fill=BOTH, expand=YES, pady=10)
+        
+        # Add toolbar for formation plot
+        toolbar_frame = ttk.Frame(self.formation_tab)
+        toolbar_frame.pack(fill=X)
+        toolbar = NavigationToolbar2Tk(self.canvas_formation, toolbar_frame)
+        toolbar.update()
+        
+        # Static pitch drawn once; player artists are blitted on updates
+        self.formation_pitch = FormationPitch(
+            self.ax_formation,
+            self.canvas_formation,
+            font_family=self.plot_font_family
+        )
+        # One hover handler and one tooltip window for the lifetime of the canvas
+        self.formation_tip = HoverTip(self.canvas_formation.get_tk_widget())
+        self.connect_formation_hover(self.on_formation_hover)
+        
+        # Create matplotlib figure for performance
+        self.fig_performance = Figure(figsize=(10, 7), facecolor='#2b2b2b')
+        self.ax_performance = self.fig_performance.add_subplot(111)
+        self.canvas_performance = FigureCanvasTkAgg(self.fig_performance, master=self.performance_tab)
+        self.canvas_performance.get_tk_widget().pack(fill=BOTH, expand=YES, pady=10)
+        
+        # Add toolbar for performance plot
+        toolbar_frame_perf = ttk.Frame(self.performance_tab)
+        toolbar_frame_perf.pack(fill=X)
+        toolbar_perf = NavigationToolbar2Tk(self.canvas_performance, toolbar_frame_perf)
+        toolbar_perf.update()
 
     def on_current_player_select(self, event):
         """Handle selection of a player from current team."""
         try:
             selected = self.current_team_tree.selection()
             if selected:
-                # Get the selected player
-                player_name = self.current_team_tree.item(selected[0])['values'][0]
-                player = self.optimal_team[self.optimal_team['Player'] == player_name].iloc[0]
+                # Tree items are lineup slots
+                player = self.lineup.player(int(selected[0]))
                 
                 # Get and display similar players
                 similar_players = self.compute_similar_players(player)
@@ -478,8 +807,8 @@ class TeamBuilderGUI:
                 self.similar_players_tree.delete(*self.similar_players_tree.get_children())
                 
                 if not similar_players.empty:
-                    for _, similar_player in similar_players.iterrows():
-                        self.similar_players_tree.insert("", "end", values=(
+                    for player_id, similar_player in similar_players.iterrows():
+                        self.similar_players_tree.insert("", "end", iid=str(player_id), values=(
                             similar_player['Player'],
                             similar_player['Pos'],
                             f"{similar_player['performance_score']:.2f}",
@@ -517,41 +846,118 @@ class TeamBuilderGUI:
         similar_selected = self.similar_players_tree.selection()
         
         if current_selected and similar_selected:
-            # Get the players
-            current_player_name = self.current_team_tree.item(current_selected[0])['values'][0]
-            similar_player_name = self.similar_players_tree.item(similar_selected[0])['values'][0]
-            
-            # Get the current player's index in optimal_team
-            current_player_idx = self.optimal_team[self.optimal_team['Player'] == current_player_name].index[0]
-            
-            # Get the similar player's data
-            similar_player = self.df[self.df['Player'] == similar_player_name].iloc[0]
+            # Tree items are the lineup slot and the similar player's id
+            slot = int(current_selected[0])
+            current_player_name = self.lineup.player(slot)['Player']
             
-            # Replace the player in optimal_team
-            self.optimal_team.loc[current_player_idx] = similar_player
-            
-            # Update all UI elements
-            self.update_ui()
+            new_player = self.swap_player(slot, int(similar_selected[0]))
+            if new_player is None:
+                return
             
             # Show success message
             ttk.Messagebox.show_info(
                 title="Player Replaced",
-                message=f"Successfully replaced {current_player_name} with {similar_player_name}",
+                message=f"Successfully replaced {current_player_name} with {new_player['Player']}",
                 parent=self.root
             )
 
+    def swap_player(self, slot, player_id):
+        """Put player ``player_id`` in lineup ``slot`` and refresh only that slot.
+        
+        Returns the new player's row, or None if the swap was refused.
+        """
+        row = self.engine.table.rows([player_id])
+        score = self.player_scores([player_id])[0]
+        try:
+            self.lineup.swap(slot, row, score)
+        except ValueError as e:
+            self.show_warning(str(e))
+            return None
+        
+        self.mark_dirty(slots=[slot])
+        return self.lineup.player(slot)
+
+    def compare_groups(self):
+        """Show the best XI of every club, nation or age band."""
+        try:
+            grouped = self.engine.best_xi_by(self.snapshot_generation_params(), self.group_by_var.get())
+        except ValueError as e:
+            self.show_warning(str(e))
+            return
+        
+        tree = self.comparison_tree
+        tree.delete(*tree.get_children())
+        players = grouped.players.groupby('group', sort=False)
+        for number, summary in enumerate(grouped.summary.itertuples(index=False)):
+            needed = "" if summary.complete else " (incomplete)"
+            parent = tree.insert("", "end", text=f"{number + 1}. {summary.group}", values=(
+                "",
+                f"{summary.total_score:.2f}",
+                f"{summary.players}{needed}"
+            ))
+            for player in players.get_group(summary.group).itertuples(index=False):
+                tree.insert(parent, "end", text=player.Player, values=(
+                    player.pos_group,
+                    f"{player.performance_score:.2f}",
+                    ""
+                ))
+        self.notebook.select(self.comparison_tab)
+
+    def on_search_changed(self, *args):
+        """Refresh the search results as the query is typed."""
+        results = self.engine.search_players(self.search_var.get(), SEARCH_RESULTS)
+        self.search_result_ids = results.index.tolist()
+        self.search_results.delete(0, END)
+        for player in results.itertuples(index=False):
+            self.search_results.insert(END, f"{player.Player} ({player.Pos}, {player.Team})")
+
+    def selected_search_player(self):
+        selected = self.search_results.curselection()
+        if not selected:
+            self.show_warning("Select a player from the search results first.")
+            return None
+        return self.df.loc[self.search_result_ids[selected[0]]]
+
+    def pin_searched_player(self):
+        """Put the searched player in the lineup, replacing the weakest player in a role they can fill."""
+        player = self.selected_search_player()
+        if player is None:
+            return
+        if self.lineup is None:
+            self.show_warning("Generate a team first, then pin players into it.")
+            return
+        
+        mask = self.engine.roles.masks[player.name]
+        slots = [
+            slot for slot, pos in enumerate(self.optimal_team['pos_group'])
+            if ROLE_BITS.get(pos, 0) & mask
+        ]
+        if not slots:
+            self.show_warning(f"{player['Player']} cannot play any position in the current lineup.")
+            return
+        scores = self.optimal_team['performance_score'].to_numpy()
+        self.swap_player(min(slots, key=lambda slot: scores[slot]), player.name)
+
+    def show_searched_similar(self):
+        player = self.selected_search_player()
+        if player is not None:
+            self.show_similar_players(player)
+
+    def current_team_values(self, player):
+        return (
+            player['Player'],
+            player['Pos'],
+            f"{player['performance_score']:.2f}"
+        )
+
     def update_replacement_tab(self):
         """Update the replacement tab with current team data."""
         # Clear current team tree
         self.current_team_tree.delete(*self.current_team_tree.get_children())
         
-        # Add current team players
-        for _, player in self.optimal_team.iterrows():
-            self.current_team_tree.insert("", "end", values=(
-                player['Player'],
-                player['Pos'],
-                f"{player['performance_score']:.2f}"
-            ))
+        # Add current team players, one item per lineup slot
+        for slot, (_, player) in enumerate(self.optimal_team.iterrows()):
+            self.current_team_tree.insert("", "end", iid=str(slot), values=self.current_team_values(player))
         
         # Clear similar players tree
         self.similar_players_tree.delete(*self.similar_players_tree.get_children())
@@ -560,315 +966,265 @@ class TeamBuilderGUI:
         self.replace_button.configure(state="disabled")
 
     def start_team_generation(self):
-        # Disable generate button and show progress
-        self.generate_btn.configure(state="disabled")
+        # Show progress; the button stays enabled so a newer request can
+        # supersede one that is still running
         self.progress.pack(pady=10)
         self.progress.start(10)
         
-        # Start team generation in a separate thread
-        thread = threading.Thread(target=self.generate_team)
-        thread.daemon = True
-        thread.start()
-        
-    def generate_team(self):
-        # Simulate some processing time
-        time.sleep(1)
-        
-        # Get selected tactic and formation
-        tactic_choice = self.tactic_var.get()
-        formation = [int(num) for num in self.formation_var.get().split('-')]
-        weights = self.tactics[tactic_choice]
-        
-        # Apply filters
-        filtered_df = self.df.copy()
-        
-        # Age filter
+        # A new draw, kept while the weight sliders move so that only the
+        # weights change the lineup
+        self.weight_seed = int(np.random.randint(2**31))
+        self.submit_generation()
+    
+    def submit_generation(self):
+        # Snapshot the settings here, on the Tk thread, and compute off it
+        try:
+            params = self.snapshot_generation_params()
+        except ValueError as e:
+            self.on_team_generation_failed(e)
+            return
+        # The tuner's live array, not a copy: it only changes in place on the
+        # Tk thread, which then submits again, so a job that read it
+        # mid-update is superseded and its result dropped
+        scores = self.weight_tuner.scores if self.weight_tuner.tuned else None
+        self.generation_worker.submit(
+            self.generate_team,
+            params,
+            scores,
+            self.weight_seed,
+            on_done=self.on_team_generated,
+            on_error=self.on_team_generation_failed
+        )
+    
+    def build_weight_sliders(self):
+        """One slider per weight of the selected tactic, at its defined value."""
+        self.weight_tuner = self.engine.tuner(self.tactic_var.get())
+        for child in self.weight_sliders.winfo_children():
+            child.destroy()
+        self.weight_vars = {}
+        self.weight_labels = {}
+        for row, (column, weight) in enumerate(self.weight_tuner.weights.items()):
+            ttk.Label(self.weight_sliders, text=column, font=self.custom_font).grid(row=row, column=0, sticky=W)
+            self.weight_vars[column] = tk.DoubleVar(value=weight)
+            ttk.Scale(
+                self.weight_sliders,
+                from_=min(0.0, weight),
+                to=max(WEIGHT_MAX, weight),
+                variable=self.weight_vars[column],
+                command=lambda value, column=column: self.on_weight_changed(column, value)
+            ).grid(row=row, column=1, sticky=EW, padx=5)
+            self.weight_labels[column] = ttk.Label(self.weight_sliders, text=f"{weight:.2f}", width=5)
+            self.weight_labels[column].grid(row=row, column=2, sticky=E)
+    
+    def on_weight_changed(self, column, value):
+        """Rescore incrementally and re-select the XI while a slider moves."""
+        value = round(float(value), 2)
+        self.weight_labels[column].configure(text=f"{value:.2f}")
+        if self.weight_tuner.set_weights({column: value}):
+            self.rerank_team()
+    
+    def reset_weights(self):
+        for column, weight in self.weight_tuner.initial.items():
+            self.weight_vars[column].set(weight)
+            self.weight_labels[column].configure(text=f"{weight:.2f}")
+        if self.weight_tuner.reset():
+            self.rerank_team()
+    
+    def rerank_team(self):
+        """Re-rank the visible player browser and re-select a shown or pending lineup.
+        
+        No progress bar: the worker coalesces jobs, so a fast drag only
+        selects and draws the newest weights.
+        """
+        if str(self.notebook.select()) == str(self.browser_tab):
+            self.refresh_browser()
+        if self.lineup is not None or self.generation_worker.busy:
+            self.submit_generation()
+    
+    def player_scores(self, rows):
+        """Scores of player ids ``rows`` under the selected tactic and weights."""
+        return self.weight_tuner.scores[rows]
+        
+    def snapshot_generation_params(self):
+        """Read every generation setting from the Tk variables."""
         try:
             min_age = int(self.min_age_var.get())
             max_age = int(self.max_age_var.get())
-            filtered_df = filtered_df[
-                (filtered_df['Age'] >= min_age) & 
-                (filtered_df['Age'] <= max_age)
-            ]
         except ValueError:
-            pass  # Invalid age range, ignore filter
-        
-        # Nationality filter
-        if self.nationality_var.get() != "Any":
-            filtered_df = filtered_df[filtered_df['Nation'] == self.nationality_var.get()]
-        
-        # Club filter
-        if self.club_var.get() != "Any":
-            filtered_df = filtered_df[filtered_df['Team'] == self.club_var.get()]
+            min_age = max_age = None  # Invalid age range, ignore filter
         
-        # Availability filters
-        if self.exclude_injured_var.get() and 'Injured' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Injured'] != True]
-        
-        if self.exclude_suspended_var.get() and 'Suspended' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Suspended'] != True]
-        
-        # Calculate performance scores
-        filtered_df['performance_score'] = (
-            filtered_df['Gls'] * weights['Gls'] +
-            filtered_df['Ast'] * weights['Ast'] +
-            filtered_df['xG'] * weights['xG'] +
-            filtered_df['PrgP'] * weights['PrgP']
-        )
-        
-        # Select team
-        team = []
-        positions_needed = {'GK': 1, 'DF': formation[0], 'MF': formation[1], 'FW': formation[2]}
+        try:
+            min_minutes = float(self.min_minutes_var.get() or 0)
+        except ValueError:
+            min_minutes = None  # Invalid value, ignore filter
         
-        for pos, count in positions_needed.items():
-            # Get all players for this position
-            pos_players = filtered_df[filtered_df['pos_group'] == pos]
-            
-            if len(pos_players) < count:
-                # Not enough players for this position, show warning
-                self.root.after(0, lambda: self.show_warning(
-                    f"Not enough {pos} players available with current filters. "
-                    f"Please adjust filters or try a different formation."
-                ))
-                return
-            
-            # Sort by performance score
-            pos_players = pos_players.sort_values('performance_score', ascending=False)
-            
-            # Take top 3 players for randomization
-            top_players = pos_players.head(3)
-            
-            # Randomly select players from top performers
-            selected_players = top_players.sample(n=min(count, len(top_players)))
-            
-            # If we need more players, add them from the remaining pool
-            if len(selected_players) < count:
-                remaining_players = pos_players[~pos_players.index.isin(selected_players.index)]
-                additional_players = remaining_players.head(count - len(selected_players))
-                selected_players = pd.concat([selected_players, additional_players])
-            
-            team.append(selected_players)
+        try:
+            max_per_club = int(self.max_per_club_var.get()) if self.max_per_club_var.get().strip() else None
+        except ValueError:
+            max_per_club = None  # Invalid value, ignore constraint
+        
+        return make_params({
+            'tactic': self.tactic_var.get(),
+            'formation': self.formation_var.get(),
+            'selection_mode': self.selection_mode_var.get(),
+            'min_age': min_age,
+            'max_age': max_age,
+            'nation': None if self.nationality_var.get() == "Any" else self.nationality_var.get(),
+            'team': None if self.club_var.get() == "Any" else self.club_var.get(),
+            'exclude_injured': self.exclude_injured_var.get(),
+            'exclude_suspended': self.exclude_suspended_var.get(),
+            'min_minutes': min_minutes,
+            'max_per_club': max_per_club,
+        }, tactics=self.tactics)
+        
+    def generate_team(self, params, scores=None, seed=None):
+        """Build a team from a settings snapshot; runs on the worker thread.
+        
+        Must not touch Tk. ``scores`` are tuned scores of every player (None
+        for the tactic's own). Raises ValueError with a user-facing message
+        when the filters leave too few players.
+        """
+        return self.engine.generate_team(params, seed=seed, scores=scores)
+        
+    def on_team_generated(self, team):
+        """Apply the latest generated team (Tk thread)."""
+        self.lineup = Lineup(team)
+        self.optimal_team = self.lineup.frame
+        self.update_ui()
         
-        self.optimal_team = pd.concat(team)
+    def on_team_generation_failed(self, error):
+        """Report a failed generation and reset the controls (Tk thread)."""
+        self.stop_progress()
+        if isinstance(error, ValueError):
+            self.show_warning(str(error))
+        else:
+            print(f"Error generating team: {error}")
+            ttk.Messagebox.show_error(
+                title="Error",
+                message="An error occurred while generating the team.",
+                parent=self.root
+            )
         
-        # Update UI in the main thread
-        self.root.after(0, self.update_ui)
+    def stop_progress(self):
+        self.progress.stop()
+        self.progress.pack_forget()
         
     def update_ui(self):
         """Update all UI elements after team changes."""
-        # Update team list
-        self.create_team_list()
-        
-        # Update formation plot
+        # Every view is stale; only the visible one renders now
+        self.mark_dirty()
+        
+        # Hide progress
+        self.stop_progress()
+    
+    def mark_dirty(self, slots=None):
+        """Mark every view stale and render the visible one.
+        
+        ``slots`` lists the lineup slots that changed; None means the whole
+        team. Views that can update single slots get the accumulated set.
+        """
+        for view in self.view_renderers:
+            if slots is None or self.dirty.get(view, set()) is None:
+                self.dirty[view] = None
+            else:
+                self.dirty[view] = self.dirty.get(view, set()) | set(slots)
+        self.render_visible()
+    
+    def render_visible(self):
+        """Render the visible view if it is stale."""
+        view = self.tab_views.get(str(self.notebook.select()))
+        if view in self.dirty:
+            slots = self.dirty.pop(view)
+            self.view_renderers[view](slots)
+    
+    def on_tab_changed(self, event):
+        self.render_visible()
+        if str(self.notebook.select()) == str(self.browser_tab):
+            self.refresh_browser()
+    
+    def refresh_browser(self):
+        """Apply the current tactic and, if enabled, the player filters to the browser."""
+        try:
+            params = self.snapshot_generation_params()
+        except ValueError as e:
+            self.show_warning(str(e))
+            return
+        table = self.engine.table
+        self.browser_model.set_extra('performance_score', self.player_scores(table.ids))
+        self.browser_model.set_rows(self.engine.filtered_rows(params) if self.browser_filters_var.get() else table.ids)
+        self.browser.refresh()
+        self.browser_count.configure(text=f"{len(self.browser_model)} of {table.n_rows} players")
+    
+    def render_formation(self, slots):
+        # The pitch itself redraws only the slots that changed
         self.plot_formation([int(num) for num in self.formation_var.get().split('-')])
-        
-        # Update performance plot
+    
+    def render_performance(self, slots):
+        # Bars are sorted by score, so any change re-renders the chart
         self.plot_performance()
-        
-        # Update replacement tab
-        self.update_replacement_tab()
-        
-        # Re-enable generate button and hide progress
-        self.generate_btn.configure(state="normal")
-        self.progress.stop()
-        self.progress.pack_forget()
+    
+    def render_team_list(self, slots):
+        if slots is None:
+            self.create_team_list()
+            return
+        for slot in slots:
+            self.team_list.item(str(slot), values=self.team_list_values(self.lineup.player(slot)))
+    
+    def render_replacement(self, slots):
+        if slots is None:
+            self.update_replacement_tab()
+            return
+        for slot in slots:
+            self.current_team_tree.item(str(slot), values=self.current_team_values(self.lineup.player(slot)))
+        self.similar_players_tree.delete(*self.similar_players_tree.get_children())
+        self.replace_button.configure(state="disabled")
         
     def plot_performance(self):
-        self.ax_performance.clear()
-        
-        # Sort players by performance score
-        sorted_team = self.optimal_team.sort_values('performance_score', ascending=True)
-        
-        # Create horizontal bar chart
-        bars = self.ax_performance.barh(
-            sorted_team['Player'],
-            sorted_team['performance_score'],
-            color='#375a7f'
-        )
+        from charts import draw_performance
         
-        # Add value labels
-        for bar in bars:
-            width = bar.get_width()
-            self.ax_performance.text(
-                width + 0.1,
-                bar.get_y() + bar.get_height()/2,
-                f'{width:.2f}',
-                va='center',
-                fontfamily='Poppins'
-            )
-        
-        # Customize plot
-        self.ax_performance.set_title(
-            'Player Performance Scores',
-            color='white',
-            pad=20,
-            fontfamily='Poppins',
-            fontsize=12
-        )
-        self.ax_performance.set_facecolor('#2b2b2b')
-        self.ax_performance.tick_params(colors='white', labelsize=10)
-        self.ax_performance.grid(True, linestyle='--', alpha=0.3)
+        self.ensure_figures()
+        draw_performance(self.ax_performance, self.optimal_team, self.plot_font_family)
         
         # Adjust layout
         self.fig_performance.tight_layout()
         self.canvas_performance.draw()
 
     def plot_formation(self, formation):
-        self.ax_formation.clear()
-        self.ax_formation.set_xlim(0, 10)
-        self.ax_formation.set_ylim(0, 7)  # Increased height for better spacing
-        self.ax_formation.axis('off')
-        self.ax_formation.set_facecolor('#2b2b2b')
-        
-        # Draw football field
-        field = patches.Rectangle((0, 0), 10, 7, facecolor='#1a472a', alpha=0.3)
-        self.ax_formation.add_patch(field)
-        
-        # Draw center circle
-        center_circle = patches.Circle((5, 3.5), 1, fill=False, color='white', alpha=0.5)
-        self.ax_formation.add_patch(center_circle)
-        
-        # Draw center line
-        self.ax_formation.plot([0, 10], [3.5, 3.5], color='white', alpha=0.5, linestyle='--')
-        
-        # Define formation positions with adjusted y-coordinates
-        if formation == [4, 3, 3]:
-            formation_positions = {
-                'GK': [(5, 0.5)],
-                'DF': [(2, 1.5), (4, 1.5), (6, 1.5), (8, 1.5)],
-                'MF': [(3, 3.5), (5, 3.5), (7, 3.5)],
-                'FW': [(2, 5.5), (5, 5.5), (8, 5.5)]
-            }
-        elif formation == [3, 5, 2]:
-            formation_positions = {
-                'GK': [(5, 0.5)],
-                'DF': [(3, 1.5), (5, 1.5), (7, 1.5)],
-                'MF': [(2, 3.5), (4, 3.5), (5, 3.5), (6, 3.5), (8, 3.5)],
-                'FW': [(4, 5.5), (6, 5.5)]
-            }
-        elif formation == [4, 4, 2]:
-            formation_positions = {
-                'GK': [(5, 0.5)],
-                'DF': [(2, 1.5), (4, 1.5), (6, 1.5), (8, 1.5)],
-                'MF': [(2, 3.5), (4, 3.5), (6, 3.5), (8, 3.5)],
-                'FW': [(4, 5.5), (6, 5.5)]
-            }
-        else:
-            formation_positions = {
-                'GK': [(5, 0.5)],
-                'DF': [(2, 1.5), (4, 1.5), (6, 1.5), (8, 1.5)],
-                'MF': [(3, 3.5), (5, 3.5), (7, 3.5)],
-                'FW': [(2, 5.5), (5, 5.5), (8, 5.5)]
-            }
-        
-        # Find top performer
-        top_performer = self.optimal_team.loc[self.optimal_team['performance_score'].idxmax()]
-        
-        # Plot players
-        for idx, player in self.optimal_team.iterrows():
-            pos = player['pos_group']
-            if formation_positions.get(pos):
-                plot_x, plot_y = formation_positions[pos].pop(0)
-                
-                # Create player circle
-                is_top_performer = player['Player'] == top_performer['Player']
-                circle = patches.Circle(
-                    (plot_x, plot_y),
-                    0.5,  # Increased circle size
-                    facecolor='#375a7f',
-                    edgecolor='gold' if is_top_performer else 'white',
-                    linewidth=2 if is_top_performer else 1
-                )
-                self.ax_formation.add_patch(circle)
-                
-                # Format player name and position
-                name = player['Player']
-                if len(name) > 15:  # Truncate long names
-                    name = name[:12] + "..."
-                
-                # Add player name and position with dynamic font size
-                fontsize = 8 if len(name) <= 10 else 7
-                self.ax_formation.text(
-                    plot_x, plot_y - 0.1,  # Adjusted y position
-                    name,
-                    ha='center', va='center',
-                    fontsize=fontsize,
-                    color='white',
-                    fontfamily='Poppins'
-                )
-                
-                # Add position below name
-                self.ax_formation.text(
-                    plot_x, plot_y + 0.1,  # Adjusted y position
-                    f"({player['Pos']})",
-                    ha='center', va='center',
-                    fontsize=7,
-                    color='white',
-                    fontfamily='Poppins'
-                )
-                
-                # Add star for top performer
-                if is_top_performer:
-                    # Create a star using multiple triangles
-                    star_points = []
-                    for i in range(5):
-                        # Outer point
-                        angle = i * 2 * np.pi / 5 - np.pi / 2
-                        star_points.append((
-                            plot_x + 0.4 * np.cos(angle),
-                            plot_y + 0.8 + 0.4 * np.sin(angle)
-                        ))
-                        # Inner point
-                        angle = (i + 0.5) * 2 * np.pi / 5 - np.pi / 2
-                        star_points.append((
-                            plot_x + 0.2 * np.cos(angle),
-                            plot_y + 0.8 + 0.2 * np.sin(angle)
-                        ))
-                    
-                    star = patches.Polygon(
-                        star_points,
-                        closed=True,
-                        fill=True,
-                        color='gold'
-                    )
-                    self.ax_formation.add_patch(star)
-        
-        self.ax_formation.set_title(
-            f"Optimal Team - {self.tactic_var.get().capitalize()} Tactic - Formation {self.formation_var.get()}",
-            color='white',
-            pad=20,
-            fontfamily='Poppins',
-            fontsize=12
+        self.ensure_figures()
+        self.formation_pitch.set_title(
+            f"Optimal Team - {self.tactic_var.get().capitalize()} Tactic - Formation {self.formation_var.get()}"
+        )
+        # The players under the mouse may have changed
+        self.formation_tip.hide()
+        self.formation_pitch.show_team(self.optimal_team, formation)
+
+    def connect_formation_hover(self, handler):
+        """Route mouse motion on the formation canvas to ``handler``, replacing any previous one."""
+        if self.formation_hover_cid is not None:
+            self.canvas_formation.mpl_disconnect(self.formation_hover_cid)
+        self.formation_hover_cid = self.canvas_formation.mpl_connect('motion_notify_event', handler)
+
+    def on_formation_hover(self, event):
+        """Show a tooltip for the player under the mouse."""
+        slot = None
+        if event.inaxes == self.ax_formation:
+            slot = self.formation_pitch.slot_at(event.xdata, event.ydata)
+        if slot is None:
+            self.formation_tip.hide()
+            return
+        row = self.formation_pitch.slot_rows[slot]
+        self.formation_tip.show(slot, lambda: self.player_tooltip_text(self.optimal_team.iloc[row]))
+
+    def player_tooltip_text(self, player):
+        return (
+            f"Player: {player['Player']}\n"
+            f"Position: {player['Pos']}\n"
+            f"Performance Score: {player['performance_score']:.2f}\n"
+            f"Goals: {player['Gls']:.1f}\n"
+            f"Assists: {player['Ast']:.1f}\n"
+            f"xG: {player['xG']:.2f}\n"
+            f"Progressive Passes: {player['PrgP']:.1f}"
         )
-        
-        # Add cursor for tooltips
-        cursor = Cursor(self.ax_formation, useblit=True, color='white', linewidth=1)
-        
-        # Add tooltip functionality
-        def on_hover(event):
-            if event.inaxes == self.ax_formation:
-                for idx, player in self.optimal_team.iterrows():
-                    pos = player['pos_group']
-                    if formation_positions.get(pos):
-                        # Get the position for this player
-                        player_positions = formation_positions[pos]
-                        if player_positions:  # Check if there are positions left
-                            plot_x, plot_y = player_positions[0]
-                            if abs(event.xdata - plot_x) < 0.5 and abs(event.ydata - plot_y) < 0.5:
-                                tooltip_text = (
-                                    f"Player: {player['Player']}\n"
-                                    f"Position: {player['Pos']}\n"
-                                    f"Performance Score: {player['performance_score']:.2f}\n"
-                                    f"Goals: {player['Gls']:.1f}\n"
-                                    f"Assists: {player['Ast']:.1f}\n"
-                                    f"xG: {player['xG']:.2f}\n"
-                                    f"Progressive Passes: {player['PrgP']:.1f}"
-                                )
-                                ToolTip(self.canvas_formation.get_tk_widget(), tooltip_text)
-                                break
-        
-        self.canvas_formation.mpl_connect('motion_notify_event', on_hover)
-        self.canvas_formation.draw()
 
     def show_warning(self, message):
         ttk.Messagebox.show_warning(
@@ -878,67 +1234,17 @@ class TeamBuilderGUI:
         )
 
     def load_data(self):
-        # Load data
-        file_path = r'C:\Prathamesh\Yewale\Prathamesh\VIT\sem 2\Projects\PFE\data.csv'
-        self.df = pd.read_csv(file_path)
-        self.df.fillna(0, inplace=True)
-        
-        # Position mapping
-        position_map = {'DF': 'DF', 'MF': 'MF', 'FW': 'FW', 'GK': 'GK'}
-        self.df['pos_group'] = self.df['Pos'].apply(lambda x: position_map.get(x, 'Unknown'))
-        
-        # Prepare data for clustering
-        stats_cols = ['Gls', 'Ast', 'xG', 'PrgP']
-        X = self.df[stats_cols]
-        scaler = StandardScaler()
-        self.X_scaled = scaler.fit_transform(X)
-        
-        # Apply clustering
-        kmeans = KMeans(n_clusters=4, random_state=42)
-        self.df['cluster'] = kmeans.fit_predict(self.X_scaled)
-        
-        # Define tactics
-        self.tactics = {
-            'possession': {'Gls': 0.2, 'Ast': 0.4, 'xG': 0.2, 'PrgP': 0.2},
-            'counterattack': {'Gls': 0.4, 'Ast': 0.2, 'xG': 0.3, 'PrgP': 0.1},
-            'balanced': {'Gls': 0.25, 'Ast': 0.25, 'xG': 0.25, 'PrgP': 0.25}
-        }
+        # Scoring and selection live in the GUI-free engine; the frame and
+        # tactics are shared with it for the widgets
+        self.engine = TeamEngine(DEFAULT_DATA_PATH)
+        self.df = self.engine.df
+        self.tactics = self.engine.tactics
 
     def compute_similar_players(self, player, n=5):
         """Compute similar players based on performance metrics."""
         try:
-            # Get players from the same position group
-            pos_players = self.df[self.df['pos_group'] == player['pos_group']].copy()
-            
-            # Select relevant stats for comparison
-            stats = ['Gls', 'Ast', 'xG', 'PrgP']
-            
-            # Normalize the stats
-            scaler = MinMaxScaler()
-            normalized_stats = scaler.fit_transform(pos_players[stats])
-            
-            # Get the player's normalized stats
-            player_stats = scaler.transform(player[stats].values.reshape(1, -1))
-            
-            # Compute cosine similarity
-            similarities = cosine_similarity(player_stats, normalized_stats)[0]
-            
-            # Add similarity scores to the DataFrame
-            pos_players['similarity'] = similarities
-            
-            # Sort by similarity and exclude the player themselves
-            similar_df = pos_players[pos_players['Player'] != player['Player']]
-            similar_df = similar_df.sort_values('similarity', ascending=False)
-            
-            # Calculate performance score for similar players
-            similar_df['performance_score'] = (
-                similar_df['Gls'] * self.tactics[self.tactic_var.get()]['Gls'] +
-                similar_df['Ast'] * self.tactics[self.tactic_var.get()]['Ast'] +
-                similar_df['xG'] * self.tactics[self.tactic_var.get()]['xG'] +
-                similar_df['PrgP'] * self.tactics[self.tactic_var.get()]['PrgP']
-            )
-            
-            return similar_df.head(n)
+            scores = self.weight_tuner.scores if self.weight_tuner.tuned else None
+            return self.engine.compute_similar_players(player, self.tactic_var.get(), n, scores=scores)
         except Exception as e:
             print(f"Error computing similar players: {e}")
             return pd.DataFrame()
@@ -1001,20 +1307,26 @@ class TeamBuilderGUI:
                 self.replace_player_in_team(player, new_player)
                 popup.destroy()
         
-        ttk.Button(
+        replace_button = ttk.Button(
             content_frame,
             text="Replace Player",
             command=replace_player,
             style="primary.TButton"
-        ).pack(pady=10)
+        )
+        replace_button.pack(pady=10)
+        # Only players in the current lineup can be replaced
+        if self.lineup is None or player.name not in self.lineup.slot_of:
+            replace_button.configure(state="disabled")
+            ToolTip(replace_button, text=f"{player['Player']} is not in the current lineup")
 
     def replace_player_in_team(self, old_player, new_player):
         """Replace a player in the team and update UI."""
-        # Replace player in optimal_team
-        self.optimal_team = self.optimal_team.replace(old_player, new_player)
-        
-        # Update UI
-        self.update_ui()
+        # Rows are indexed by player id
+        slot = None if self.lineup is None else self.lineup.slot_of.get(old_player.name)
+        if slot is None:
+            self.show_warning(f"{old_player['Player']} is not in the current lineup.")
+            return
+        self.swap_player(slot, new_player.name)
 
     def create_team_list(self):
         """Create the team list with replace buttons."""
@@ -1022,22 +1334,46 @@ class TeamBuilderGUI:
         for item in self.team_list.get_children():
             self.team_list.delete(item)
         
-        # Add players with replace buttons
-        for idx, player in self.optimal_team.iterrows():
-            values = (
-                player['Player'],
-                player['Pos'],
-                f"{player['performance_score']:.2f}",
-                f"{player['Gls']:.1f}",
-                f"{player['Ast']:.1f}",
-                f"{player['xG']:.2f}",
-                f"{player['PrgP']:.1f}"
-            )
-            
-            # Insert the player into the treeview
-            self.team_list.insert("", "end", values=values)
+        # Add players with replace buttons, one item per lineup slot
+        for slot, (_, player) in enumerate(self.optimal_team.iterrows()):
+            self.team_list.insert("", "end", iid=str(slot), values=self.team_list_values(player))
+
+    def team_list_values(self, player):
+        return (
+            player['Player'],
+            player['Pos'],
+            f"{player['performance_score']:.2f}",
+            f"{player['Gls']:.1f}",
+            f"{player['Ast']:.1f}",
+            f"{player['xG']:.2f}",
+            f"{player['PrgP']:.1f}"
+        )
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Premier League Team Builder")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print a startup time and import breakdown once the window is ready"
+    )
+    parser.add_argument(
+        "--exit-after-startup",
+        action="store_true",
+        help="close the window as soon as startup finishes (for timing runs)"
+    )
+    args = parser.parse_args()
+    STARTUP.mark("imports")
+    
     root = ttk.Window(themename="flatly")
+    STARTUP.mark("main window")
     app = TeamBuilderGUI(root)
+    
+    def on_startup_complete():
+        STARTUP.mark("first idle")
+        if args.startup_report:
+            print(STARTUP.report(import_breakdown_for="team"))
+        if args.exit_after_startup:
+            root.destroy()
+    
+    root.after_idle(on_startup_complete)
     root.mainloop()
\ No newline at end of file
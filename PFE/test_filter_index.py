@@ -0,0 +1,62 @@
+"""Bitmap filter queries select the same rows as a pandas boolean mask."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import FilterIndex
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'Age': rng.integers(16, 40, n),
+        'Min': rng.choice([0, 90, 450, 900, 1800, 3000], n),
+        'Nation': rng.choice(['eng ENG', 'es ESP', 'fr FRA', 'br BRA'], n),
+        'Team': rng.choice(['Arsenal', 'Chelsea', 'Everton', 'Fulham'], n),
+        'Injured': rng.random(n) < 0.1,
+        'Suspended': rng.random(n) < 0.05,
+        'cluster': rng.integers(0, 5, n),
+    })
+
+
+def pandas_rows(df, min_age=None, max_age=None, nation=None, team=None,
+                exclude_injured=False, exclude_suspended=False, min_minutes=None, clusters=None):
+    mask = pd.Series(True, index=df.index)
+    if min_age is not None:
+        mask &= df['Age'] >= min_age
+    if max_age is not None:
+        mask &= df['Age'] <= max_age
+    if nation is not None:
+        mask &= df['Nation'] == nation
+    if team is not None:
+        mask &= df['Team'] == team
+    if exclude_injured:
+        mask &= ~df['Injured']
+    if exclude_suspended:
+        mask &= ~df['Suspended']
+    if min_minutes is not None:
+        mask &= df['Min'] >= min_minutes
+    if clusters is not None:
+        mask &= df['cluster'].isin(clusters)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {'min_age': 18, 'max_age': 23},
+    {'max_age': 16},
+    {'min_age': 50},
+    {'nation': 'es ESP'},
+    {'nation': 'it ITA'},
+    {'team': 'Chelsea', 'exclude_injured': True},
+    {'min_minutes': 0},
+    {'min_minutes': 900, 'exclude_suspended': True},
+    {'clusters': [1, 3], 'nation': 'fr FRA'},
+    {'min_age': 20, 'max_age': 30, 'nation': 'eng ENG', 'team': 'Arsenal',
+     'exclude_injured': True, 'exclude_suspended': True, 'min_minutes': 450, 'clusters': [0, 2, 4]},
+])
+def test_query_matches_a_pandas_mask(df, filters):
+    rows = FilterIndex(df).query(**filters)
+    np.testing.assert_array_equal(rows, pandas_rows(df, **filters))
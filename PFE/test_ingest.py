@@ -0,0 +1,127 @@
+"""Refresh a small dataset from a local stub of fbrapi.com."""
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from ingest import ConditionalFetcher, FbrApiSource, ResponseCache, make_session, refresh
+
+DATA_PATH = Path(__file__).with_name("data.csv")
+CLUB = "Manchester City"
+
+
+def player(name, minutes, goals, assists, country="ESP"):
+    return {
+        'meta_data': {'player_name': name, 'player_country_code': country, 'age': 27},
+        'stats': {'stats': {
+            'positions': 'MF', 'matches_played': 35, 'starts': 35, 'min': minutes,
+            'gls': goals, 'ast': assists, 'pk_made': 0, 'pk_att': 0,
+            'xg': 4.5, 'non_pen_xg': 4.5, 'xag': 4.0,
+        }},
+    }
+
+
+PAGES = {
+    '/team-season-stats': {'data': [{'meta_data': {'team_id': 'b8fd03ef', 'team_name': CLUB}}]},
+    '/player-season-stats': {'players': [
+        player('Rodri', 3000, 9, 9),
+        player('New Signing', 450, 2, 1, country="BRA"),
+    ]},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        body = json.dumps(PAGES[url.path]).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        not_modified = self.headers.get('If-None-Match') == etag
+        self.requests_seen.append((url.path, parse_qs(url.query), not_modified))
+        if not_modified:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StubHandler.requests_seen = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def run_refresh(data_path, base_url, cache_dir):
+    session = make_session(pool_size=2)
+    fetcher = ConditionalFetcher(session, ResponseCache(cache_dir))
+    try:
+        return refresh(data_path, [FbrApiSource(9, '2023-2024', base_url=base_url)], fetcher, workers=2)
+    finally:
+        session.close()
+
+
+def test_refresh_recomputes_derived_columns_and_keeps_dtypes(tmp_path, stub_url):
+    data_path = tmp_path / "data.csv"
+    original = pd.read_csv(DATA_PATH)
+    original.to_csv(data_path, index=False)
+
+    report, fetched, changed = run_refresh(data_path, stub_url, tmp_path / "cache")
+    assert (report.added, report.updated) == (1, 1)
+    assert (fetched, changed) == (2, 2)
+
+    merged = pd.read_csv(data_path)
+    assert merged.shape == (len(original) + 1, original.shape[1])
+    assert list(merged.columns) == list(original.columns)
+    assert merged.dtypes.equals(original.dtypes)
+
+    rodri = merged[(merged['Player'] == 'Rodri') & (merged['Team'] == CLUB)].iloc[0]
+    assert (rodri['Gls'], rodri['Min']) == (9, 3000)
+    assert rodri['90s'] == 33.3
+    assert rodri['G+A'] == 18
+    assert rodri['Gls_90'] == 0.27
+    assert rodri['G+A_90'] == 0.54
+    assert rodri['xG+xAG_90'] == 0.26
+
+    signing = merged[merged['Player'] == 'New Signing'].iloc[0]
+    assert signing['Nation'] == 'bra BRA'
+    assert signing['90s'] == 5.0
+    assert signing['Gls_90'] == 0.4
+    assert signing['npxG+xAG'] == 8.5
+
+    # Untouched rows are written back exactly as they were
+    others = merged.iloc[:len(original)]['Player'] != 'Rodri'
+    pd.testing.assert_frame_equal(
+        merged.iloc[:len(original)][others], original[others], check_exact=True
+    )
+
+
+def test_unchanged_refresh_is_conditional_and_leaves_the_file(tmp_path, stub_url):
+    data_path = tmp_path / "data.csv"
+    pd.read_csv(DATA_PATH).to_csv(data_path, index=False)
+    run_refresh(data_path, stub_url, tmp_path / "cache")
+    before = data_path.read_bytes()
+
+    report, fetched, changed = run_refresh(data_path, stub_url, tmp_path / "cache")
+    assert (report.added, report.updated, changed) == (0, 0, 0)
+    assert data_path.read_bytes() == before
+    assert all(not_modified for _, _, not_modified in StubHandler.requests_seen[-fetched:])
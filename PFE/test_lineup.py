@@ -0,0 +1,45 @@
+"""Swapping a player into a lineup slot by id."""
+import pandas as pd
+import pytest
+
+from lineup import Lineup
+
+
+def team():
+    return pd.DataFrame({
+        'Player': ["Raya", "Saliba", "Rice"],
+        'Team': ["Arsenal"] * 3,
+        'pos_group': ["GK", "DF", "MF"],
+        'performance_score': [10.0, 20.0, 30.0],
+        'selection_rate': [1.0, 0.8, 0.6],
+    }, index=[4, 17, 23])
+
+
+def row(player_id, name, team="Chelsea"):
+    """A one-row frame as ``table.rows`` returns it."""
+    return pd.DataFrame({'Player': [name], 'Team': [team], 'pos_group': ["FW"]}, index=[player_id])
+
+
+def test_swap_replaces_the_slot_in_place():
+    lineup = Lineup(team())
+    lineup.swap(1, row(40, "Colwill"), 25.0)
+
+    assert lineup.ids.tolist() == [4, 40, 23]
+    assert lineup.slot_of == {4: 0, 40: 1, 23: 2}
+    assert lineup.frame.index.tolist() == [4, 40, 23]
+    swapped = lineup.player(1)
+    assert (swapped['Player'], swapped['Team'], swapped['pos_group']) == ("Colwill", "Chelsea", "DF")
+    assert swapped['performance_score'] == 25.0
+    assert pd.isna(swapped['selection_rate'])
+
+    # The player who left can come back in
+    lineup.swap(2, row(17, "Saliba", "Arsenal"), 20.0)
+    assert lineup.slot_of == {4: 0, 40: 1, 17: 2}
+
+
+def test_swap_rejects_a_player_already_in_the_xi():
+    lineup = Lineup(team())
+    with pytest.raises(ValueError, match="Rice is already in the team"):
+        lineup.swap(1, row(23, "Rice", "Arsenal"), 30.0)
+    assert lineup.ids.tolist() == [4, 17, 23]
+    assert lineup.frame['Player'].tolist() == ["Raya", "Saliba", "Rice"]
@@ -0,0 +1,57 @@
+"""Type-ahead search by prefix, later word and infix, ignoring accents."""
+import pytest
+
+from name_index import NameIndex, normalize
+
+# Ids are positions in this list
+NAMES = [
+    "Julián Álvarez",
+    "Álvaro Morata",
+    "Martin Ødegaard",
+    "Alexis Mac Allister",
+    "Pierre-Emile Højbjerg",
+    "Alvaro Fernández",
+    "Emile Smith Rowe",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return NameIndex(NAMES)
+
+
+def test_normalize_folds_case_and_accents():
+    assert normalize("Martin Ødegaard") == "martin odegaard"
+    assert normalize("  Pierre-Emile  HØJBJERG ") == "pierre emile hojbjerg"
+
+
+def test_prefix_of_the_whole_name(index):
+    assert index.search("jul") == [0]
+    assert index.search("Alex") == [3]
+
+
+def test_prefix_of_a_later_word(index):
+    assert index.search("mac all") == [3]
+    assert index.search("smith") == [6]
+
+
+def test_accents_are_ignored_both_ways(index):
+    assert index.search("alvarez") == [0]
+    assert index.search("ÁLVAREZ") == [0]
+    assert index.search("odegaard") == [2]
+    assert index.search("Fernandez") == [5]
+
+
+def test_whole_name_matches_rank_before_later_words_and_infixes(index):
+    # Alphabetical among whole-name prefixes, then the later word
+    assert index.search("alva") == [5, 1, 0]
+    # "emile" starts Emile Smith Rowe and a later word of Pierre-Emile Højbjerg
+    assert index.search("emile") == [6, 4]
+    # Only inside words
+    assert index.search("varez") == [0]
+
+
+def test_limit_and_empty_queries(index):
+    assert index.search("alva", limit=2) == [5, 1]
+    assert index.search("") == []
+    assert index.search("zzz") == []
@@ -0,0 +1,58 @@
+"""The pruned ILP picks the same total as the ILP over every candidate."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import optimizer
+from roles import ROLE_BITS, role_masks
+
+POSITIONS_NEEDED = {'GK': 1, 'DF': 4, 'MF': 3, 'FW': 3}
+POS_VALUES = ['GK', 'DF', 'DF', 'MF', 'MF', 'FW', 'DF,MF', 'MF,FW', 'FW,MF']
+
+
+def players(n=120, clubs=12, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Player': [f"Player {i}" for i in range(n)],
+        'Pos': rng.choice(POS_VALUES, n),
+        'Team': [f"Club {i % clubs}" for i in range(n)],
+    })
+    return df, rng.gamma(2.0, 10.0, n).round(2)
+
+
+def every_pair(df, rows, scores, positions_needed, max_per_club=None, masks=None):
+    masks = role_masks(df['Pos'].iloc[rows].to_numpy())
+    return [
+        (candidate, pos)
+        for pos, count in positions_needed.items() if count
+        for candidate in np.flatnonzero(masks & ROLE_BITS[pos])
+    ]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("max_per_club", [None, 1, 2])
+def test_pruning_keeps_the_optimal_total(monkeypatch, seed, max_per_club):
+    df, scores = players(seed=seed)
+    rows = np.arange(len(df))
+
+    _, _, chosen = optimizer.select_optimal_xi(df, rows, scores, POSITIONS_NEEDED, max_per_club)
+    with monkeypatch.context() as patch:
+        patch.setattr(optimizer, 'prune_candidates', every_pair)
+        _, _, unpruned = optimizer.select_optimal_xi(df, rows, scores, POSITIONS_NEEDED, max_per_club)
+
+    assert chosen.sum() == pytest.approx(unpruned.sum())
+
+
+@pytest.mark.parametrize("max_per_club", [1, 2])
+def test_lineup_respects_the_club_cap(max_per_club):
+    df, scores = players()
+    rows = np.arange(len(df))
+    # Concentrate the best players in one club
+    scores[df['Team'] == "Club 0"] += 100
+
+    chosen, positions, _ = optimizer.select_optimal_xi(df, rows, scores, POSITIONS_NEEDED, max_per_club)
+
+    assert len(set(chosen.tolist())) == sum(POSITIONS_NEEDED.values())
+    assert df['Team'].iloc[chosen].value_counts().max() == max_per_club
+    for row, pos in zip(chosen, positions):
+        assert role_masks([df['Pos'].iat[row]])[0] & ROLE_BITS[pos]
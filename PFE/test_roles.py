@@ -0,0 +1,30 @@
+"""Role bitmasks for single- and multi-role ``Pos`` values."""
+import numpy as np
+import pandas as pd
+
+from player_table import PlayerTable
+from roles import ROLE_BITS, RoleIndex, parse_roles, primary_role, role_masks
+
+
+def test_parse_roles():
+    assert parse_roles("FW,MF") == 12
+    assert parse_roles("FW,MF") == ROLE_BITS['FW'] | ROLE_BITS['MF']
+    assert parse_roles("MF, FW") == parse_roles("FW,MF")
+    assert parse_roles("GK") == 1
+    assert parse_roles("") == 0
+    assert parse_roles(float('nan')) == 0
+
+
+def test_primary_role_is_the_first_known_one():
+    assert primary_role("FW,MF") == 'FW'
+    assert primary_role("XX,DF") == 'DF'
+    assert primary_role("") == 'Unknown'
+
+
+def test_role_index_members():
+    pos = ["GK", "FW,MF", "DF", "MF,DF", "FW"]
+    index = RoleIndex(PlayerTable(pd.DataFrame({'Player': list("abcde"), 'Pos': pos, 'Age': 25})))
+    np.testing.assert_array_equal(index.masks, role_masks(pos))
+    np.testing.assert_array_equal(index.members['MF'], [1, 3])
+    np.testing.assert_array_equal(index.members['FW'], [1, 4])
+    np.testing.assert_array_equal(index.eligible(np.array([0, 2, 3]), 'DF'), [False, True, True])
@@ -0,0 +1,55 @@
+"""Sampled lineups never repeat a player, and temperature 0 is greedy."""
+import numpy as np
+
+from roles import ROLE_BITS, role_masks
+from sampler import sample_lineups
+
+POSITIONS_NEEDED = {'GK': 1, 'DF': 4, 'MF': 3, 'FW': 3}
+POS_VALUES = ['GK', 'DF', 'MF', 'FW', 'DF,MF', 'MF,FW', 'FW,MF', 'MF,DF']
+
+
+def candidates(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.sort(rng.choice(1000, n, replace=False))
+    masks = role_masks(rng.choice(POS_VALUES, n))
+    return ids, rng.gamma(2.0, 10.0, n).round(2), masks
+
+
+def greedy(ids, scores, masks):
+    """Best players position by position, skipping those already picked."""
+    picked = []
+    for pos, count in POSITIONS_NEEDED.items():
+        eligible = [i for i in np.argsort(-scores, kind='stable') if masks[i] & ROLE_BITS[pos]]
+        picked.extend([i for i in eligible if i not in picked][:count])
+    return ids[picked]
+
+
+def test_no_player_fills_two_slots():
+    ids, scores, masks = candidates()
+    result = sample_lineups(
+        ids, scores, masks, POSITIONS_NEEDED, n_samples=2000, pool_size=4,
+        temperature=5.0, rng=np.random.default_rng(1),
+    )
+    assert result.lineups.shape == (2000, sum(POSITIONS_NEEDED.values()))
+    for lineup in result.lineups:
+        assert len(set(lineup.tolist())) == len(lineup)
+
+    # Every player drawn for a position can play it
+    position_of = {player_id: mask for player_id, mask in zip(ids.tolist(), masks)}
+    for column, pos in enumerate(result.positions):
+        assert all(position_of[player_id] & ROLE_BITS[pos] for player_id in result.lineups[:, column])
+
+
+def test_temperature_zero_is_greedy():
+    ids, scores, masks = candidates(seed=3)
+    result = sample_lineups(
+        ids, scores, masks, POSITIONS_NEEDED, n_samples=50, temperature=0,
+        rng=np.random.default_rng(1),
+    )
+    best = greedy(ids, scores, masks)
+    positions = np.array(result.positions)
+    for lineup in result.lineups:
+        for pos in POSITIONS_NEEDED:
+            assert sorted(lineup[positions == pos]) == sorted(best[positions == pos])
+    score_of = dict(zip(ids.tolist(), scores))
+    assert np.allclose(result.totals, sum(score_of[player_id] for player_id in best.tolist()))
@@ -0,0 +1,93 @@
+"""Background worker that only ever delivers the latest result.
+
+Used for team generation: the UI thread snapshots its parameters and submits
+a job; the job runs on one persistent thread, never touching Tk. If a new
+job is submitted while an older one is still waiting, the older one is
+dropped (coalesced), and results of jobs that were superseded while running
+are discarded. Results come back to the Tk thread through a single queue
+drained by ``root.after`` polling.
+"""
+import queue
+import threading
+
+
+class CoalescingWorker:
+    def __init__(self, root, poll_ms=15, name="worker"):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._condition = threading.Condition()
+        self._pending = None
+        self._latest = 0
+        self._outstanding = 0
+        self._results = queue.Queue()
+        self._polling = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, on_done, on_error=None):
+        """Queue ``fn(*args)``, replacing any job that has not started yet.
+
+        Must be called from the Tk thread. ``on_done(result)`` or
+        ``on_error(exception)`` is called on the Tk thread, and only if no
+        newer job was submitted in the meantime. Returns the job's token.
+        """
+        with self._condition:
+            self._latest += 1
+            if self._pending is None:
+                self._outstanding += 1
+            self._pending = (self._latest, fn, args, on_done, on_error)
+            self._condition.notify()
+            token = self._latest
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return token
+
+    @property
+    def busy(self):
+        """Whether a submitted job has not been delivered yet."""
+        with self._condition:
+            return self._outstanding > 0
+
+    def is_current(self, token):
+        """Whether ``token`` is still the newest submitted job."""
+        return token == self._latest
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                job, self._pending = self._pending, None
+            token, fn, args, on_done, on_error = job
+            if not self.is_current(token):
+                self._results.put((token, None, None, None, None))
+                continue
+            try:
+                self._results.put((token, fn(*args), None, on_done, on_error))
+            except Exception as e:
+                self._results.put((token, None, e, on_done, on_error))
+
+    def _poll(self):
+        while True:
+            try:
+                token, result, error, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._condition:
+                self._outstanding -= 1
+            if not self.is_current(token):
+                continue  # Superseded while running
+            if error is None:
+                on_done(result)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"Background job failed: {error}")
+
+        with self._condition:
+            busy = self._outstanding > 0
+        if busy:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False